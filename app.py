@@ -1,18 +1,32 @@
 import streamlit as st
 st.set_page_config(page_title="Google Maps Review Scraper", layout="wide")
 
-from sentence_transformers import SentenceTransformer, util
 import time
+_t_import = time.perf_counter()
 import os
+import functools
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pickle
+import json
+import hashlib
+import sqlite3
 import io
+import zipfile
+import gzip
 import re
 import emoji
+import numpy as np
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
 import altair as alt
 import urllib.parse
+from datetime import datetime, timedelta
+_t_core = time.perf_counter()
+import nltk
+from nltk.corpus import stopwords
+_t_nltk = time.perf_counter()
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -20,14 +34,66 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import WebDriverException
-from datetime import datetime, timedelta
+from selenium.common.exceptions import TimeoutException, WebDriverException
+_t_selenium = time.perf_counter()
+
+
+# ---------- laporan waktu startup ----------
+@st.cache_resource
+def startup_report():
+    # bertahan antar rerun: hanya nilai pertama (cold start) yang dicatat
+    return {}
+
+
+@contextmanager
+def startup_timer(component):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_report().setdefault(component, time.perf_counter() - start)
+
+
+startup_report().setdefault("import pandas/altair/emoji", _t_core - _t_import)
+startup_report().setdefault("import nltk", _t_nltk - _t_core)
+startup_report().setdefault("import selenium", _t_selenium - _t_nltk)
 
 # ---------- konfigurasi ----------
-COOKIES_FILE = "gmaps_cookies.pkl"
+COOKIES_FILE = "gmaps_cookies.json"
+LEGACY_COOKIES_FILE = "gmaps_cookies.pkl"
 COOKIE_EXPIRY_MINUTES = 60
-nltk.download("stopwords")
-stop_words = set(stopwords.words("english"))
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA_DIR", os.path.abspath("nltk_data"))
+MODEL_NAME = "paraphrase-MiniLM-L6-v2"
+MODEL_CACHE_DIR = os.environ.get("SENTENCE_TRANSFORMERS_HOME", os.path.abspath("models"))
+SEMANTIC_BACKEND = os.environ.get("GMAPS_SEMANTIC_BACKEND", "torch")  # "torch" atau "onnx"
+ONNX_MODEL_DIR = os.path.join(MODEL_CACHE_DIR, f"{MODEL_NAME}-onnx-int8")
+ONNX_THREADS = int(os.environ.get("GMAPS_ONNX_THREADS", str(os.cpu_count() or 1)))
+EMBEDDING_CACHE_DIR = os.environ.get("GMAPS_EMBEDDING_CACHE_DIR", os.path.abspath("embedding_cache"))
+EMBEDDING_CACHE_MAX_ROWS = int(os.environ.get("GMAPS_EMBEDDING_CACHE_MAX_ROWS", "200000"))
+
+
+@st.cache_resource
+def load_stop_words():
+    """
+    stopwords dibaca dari nltk_data lokal tanpa probe jaringan
+    download hanya sekali jika memang belum ada di disk
+    """
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    with startup_timer("stopwords"):
+        try:
+            return frozenset(stopwords.words("english"))
+        except LookupError:
+            pass
+        try:
+            nltk.download("stopwords", download_dir=NLTK_DATA_DIR, quiet=True)
+            return frozenset(stopwords.words("english"))
+        except Exception as e:
+            print(f"⚠️ Stopwords tidak tersedia, filter stopword dilewati: {e}")
+            return frozenset()
+
+
+stop_words = load_stop_words()
 
 report_categories = [
     "Off topic",
@@ -43,355 +109,2216 @@ report_categories = [
 
 # ---------- helper fungsi untuk cookies ----------
 # ---------- helper fungsi untuk cookies ----------
-def save_cookies(cookies, path=COOKIES_FILE):
+def save_cookies(cookies, path=COOKIES_FILE, timestamp=None):
     data = {
         "cookies": cookies,
-        "timestamp": datetime.now()
+        "timestamp": (timestamp or datetime.now()).isoformat()
     }
-    with open(path, "wb") as f:
-        pickle.dump(data, f)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def migrate_legacy_cookies(path=COOKIES_FILE, legacy_path=LEGACY_COOKIES_FILE):
+    # file pickle lama dipindah ke json sekali, timestamp aslinya dipertahankan
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return
+    try:
+        with open(legacy_path, "rb") as f:
+            data = pickle.load(f)
+        save_cookies(data.get("cookies") or [], path, timestamp=data.get("timestamp"))
+        os.remove(legacy_path)
+    except Exception as e:
+        print(f"⚠️ Gagal migrasi cookies lama: {e}")
 
 
 def load_cookies(path=COOKIES_FILE):
+    migrate_legacy_cookies(path)
     if not os.path.exists(path):
         return None
 
-    with open(path, "rb") as f:
-        data = pickle.load(f)
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError:
+        return None
 
-    # cek apakah sudah lebih dari 30 menit
+    # cek apakah sudah lebih dari COOKIE_EXPIRY_MINUTES
     timestamp = data.get("timestamp")
-    if timestamp and datetime.now() - timestamp > timedelta(minutes=COOKIE_EXPIRY_MINUTES):
+    if timestamp and datetime.now() - datetime.fromisoformat(timestamp) > timedelta(minutes=COOKIE_EXPIRY_MINUTES):
         try:
             os.remove(path)
-            print("⚠️ Cookies sudah lebih dari 30 menit — file dihapus otomatis.")
+            print(f"⚠️ Cookies sudah lebih dari {COOKIE_EXPIRY_MINUTES} menit — file dihapus otomatis.")
         except Exception as e:
             print(f"⚠️ Gagal hapus cookies: {e}")
         return None
 
-    return data.get("cookies")
+    return data.get("cookies")
+
+
+def is_cookie_file_present():
+    return os.path.exists(COOKIES_FILE) or os.path.exists(LEGACY_COOKIES_FILE)
+
+# ---------- fungsi untuk memulai browser agar user login manual ----------
+def start_manual_google_login(timeout=300):
+    """
+    buka browser chrome non headless ke halaman login google
+    user harus menyelesaikan login manual termasuk 2fa atau captcha
+    ketika url berubah keluar dari accounts.google.com atau jika avatar muncul
+    maka cookies disimpan
+    """
+    options = Options()
+    # jangan headless karena user harus berinteraksi
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    driver = webdriver.Chrome(service=chrome_service(), options=options)
+
+    try:
+        driver.get("https://accounts.google.com/signin/v2/identifier")
+        st.info("browser terbuka silakan login di jendela yang muncul selesaikan semua 2fa atau captcha jika muncul")
+        wait = WebDriverWait(driver, 5)
+        start = time.time()
+        while True:
+            current_url = driver.current_url
+            # jika url tidak lagi berada di accounts.google.com besar kemungkinan sudah login
+            if "accounts.google.com" not in current_url:
+                # simpan cookies
+                cookies = driver.get_cookies()
+                save_cookies(cookies)
+                driver.quit()
+                return True
+            # cek juga indikator avatar presence
+            try:
+                avatar = driver.find_elements(By.XPATH, "//img[contains(@alt,'Google Account') or contains(@alt,'Foto profil')]")
+                if avatar:
+                    cookies = driver.get_cookies()
+                    save_cookies(cookies)
+                    driver.quit()
+                    return True
+            except Exception:
+                pass
+
+            if time.time() - start > timeout:
+                # timeout menunggu login manual
+                driver.quit()
+                return False
+            time.sleep(1)
+    except Exception as e:
+        try:
+            driver.quit()
+        except:
+            pass
+        st.error(f"gagal membuka browser untuk login {e}")
+        return False
+
+
+# ---------- semantic model setup (lazy) ----------
+def _model_cached_locally():
+    return os.path.isdir(os.path.join(MODEL_CACHE_DIR, f"models--sentence-transformers--{MODEL_NAME}"))
+
+
+def _load_torch_encoder():
+    # jika bobot MiniLM sudah ada di cache lokal, hub dipaksa offline agar tidak ada probe jaringan
+    if _model_cached_locally():
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+        os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    with startup_timer("import sentence_transformers/torch"):
+        from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(MODEL_NAME, cache_folder=MODEL_CACHE_DIR)
+
+
+def export_onnx_model(out_dir=ONNX_MODEL_DIR):
+    """
+    export paraphrase-MiniLM-L6-v2 ke onnx lalu kuantisasi dinamis int8
+    hanya perlu dijalankan sekali, hasilnya dipakai OnnxSentenceEncoder
+    """
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    st_model = _load_torch_encoder()
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    os.makedirs(out_dir, exist_ok=True)
+
+    dummy = tokenizer(["contoh review singkat"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic_axes = {n: {0: "batch", 1: "seq"} for n in input_names + ["last_hidden_state"]}
+    fp32_path = os.path.join(out_dir, "model-fp32.onnx")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(dummy[n] for n in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state", "pooler_output"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, "model-int8.onnx"), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, "encoder.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "max_seq_length": st_model.max_seq_length,
+            "dim": st_model.get_sentence_embedding_dimension(),
+        }, f)
+    return out_dir
+
+
+class OnnxSentenceEncoder:
+    """
+    backend cpu onnxruntime (int8) dengan interface encode() yang sama dengan SentenceTransformer
+    pooling mean sesuai konfigurasi paraphrase-MiniLM-L6-v2
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, threads=ONNX_THREADS):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        if not os.path.exists(os.path.join(model_dir, "model-int8.onnx")):
+            export_onnx_model(model_dir)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, "model-int8.onnx"),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        with open(os.path.join(model_dir, "encoder.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.max_seq_length = meta["max_seq_length"]
+        self.dim = meta["dim"]
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        if isinstance(texts, str):
+            return self.encode([texts], batch_size=batch_size)[0]
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            enc = self.tokenizer(
+                list(texts[start:start + batch_size]),
+                padding=True, truncation=True, max_length=self.max_seq_length, return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self.input_names}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            outputs.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        if not outputs:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(outputs).astype(np.float32)
+
+
+def semantic_model_key(backend=SEMANTIC_BACKEND):
+    # embedding int8 tidak identik dengan torch, jadi cache dipisah per backend
+    return MODEL_NAME if backend == "torch" else f"{MODEL_NAME}@onnx-int8"
+
+
+def build_semantic_model(backend=SEMANTIC_BACKEND):
+    model = OnnxSentenceEncoder() if backend == "onnx" else _load_torch_encoder()
+    # disimpan ter-normalisasi supaya cosine similarity cukup satu perkalian matriks
+    category_embeddings = normalize_rows(model.encode(report_categories, convert_to_numpy=True))
+    return model, category_embeddings
+
+
+@st.cache_resource(show_spinner="Loading semantic model...")
+def load_semantic_model():
+    """
+    torch/sentence_transformers (atau onnxruntime) baru di-import saat klasifikasi pertama
+    backend dipilih lewat env GMAPS_SEMANTIC_BACKEND
+    """
+    with startup_timer("load semantic model"):
+        return build_semantic_model(SEMANTIC_BACKEND)
+
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.clip(norms, 1e-12, None)
+
+# ---------- helper untuk memuat cookies ke driver baru ----------
+GOOGLE_COOKIE_URL = "https://www.google.com"
+
+
+def _cdp_cookie(c):
+    # format cookie selenium -> parameter cdp Network.CookieParam
+    cookie = {k: c[k] for k in ("name", "value", "domain", "path", "secure", "httpOnly") if k in c}
+    if "expiry" in c:
+        cookie["expires"] = c["expiry"]
+    if c.get("sameSite") in ("Strict", "Lax", "None"):
+        cookie["sameSite"] = c["sameSite"]
+    if "domain" not in cookie:
+        cookie["url"] = GOOGLE_COOKIE_URL
+    return cookie
+
+
+def apply_cookies_to_driver(driver, cookies):
+    """
+    semua cookies dimasukkan sekaligus lewat cdp Network.setCookies sebelum navigasi pertama,
+    tanpa membuka google.com, refresh, atau add_cookie satu per satu
+    """
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": [_cdp_cookie(c) for c in cookies]})
+        return
+    except WebDriverException as e:
+        print(f"⚠️ Network.setCookies gagal, fallback ke add_cookie: {e}")
+
+    # fallback: add_cookie butuh halaman di domain google
+    driver.get("https://www.google.com")
+    driver.delete_all_cookies()
+    for c in cookies:
+        cookie = {k: c[k] for k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry") if k in c}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            try:
+                # coba tanpa expiry
+                driver.add_cookie({k: cookie[k] for k in cookie if k != "expiry"})
+            except Exception:
+                pass
+
+
+# tombol akun (login) dan link sign in (belum login) di bar atas google maps / google
+JS_LOGIN_PROBE = """
+if (document.querySelector("a[aria-label^='Google Account'], a[aria-label^='Akun Google'],"
+    + " img[alt^='Google Account'], img[alt^='Foto profil']")) return true;
+if (document.querySelector("a[href*='ServiceLogin'], a[href*='accounts.google.com/signin']")) return false;
+return null;
+"""
+
+
+def check_logged_in_via_driver(driver):
+    """
+    satu probe dom di halaman google yang sedang terbuka (panggil setelah navigasi maps pertama)
+    return True (tombol akun ada), False (link sign in ada), None (belum bisa dipastikan)
+    """
+    try:
+        return driver.execute_script(JS_LOGIN_PROBE)
+    except WebDriverException:
+        return None
+
+# ---------- instrumentasi scraping (waktu per fase, jumlah perintah webdriver) ----------
+METRICS_LOG_PATH = os.environ.get("GMAPS_METRICS_LOG", "scrape_metrics.jsonl")
+METRICS_PROM_PATH = os.environ.get("GMAPS_METRICS_PROM", "scrape_metrics.prom")
+
+
+class ScrapeMetrics:
+    """
+    registry metrik satu proses: total waktu per fase, perintah webdriver per jenis, review per run
+    fase boleh bersarang; yang dicatat waktu eksklusif (dikurangi waktu fase anak)
+    tiap run ditulis sebagai satu baris json dan file prometheus ditulis ulang
+    """
+
+    def __init__(self, log_path=METRICS_LOG_PATH, prom_path=METRICS_PROM_PATH):
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.phase_seconds = {}
+        self.phase_calls = {}
+        self.commands = {}
+        self.timeouts = {}
+        self.reviews = 0
+        self.new_reviews = 0
+        self.runs = {}
+        self.last_run = None
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def current_run(self):
+        return getattr(self._local, "run", None)
+
+    @contextmanager
+    def phase(self, name):
+        stack = self._stack()
+        frame = [name, time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            total = time.perf_counter() - frame[1]
+            own = total - frame[2]
+            if stack:
+                stack[-1][2] += total
+            with self._lock:
+                self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + own
+                self.phase_calls[name] = self.phase_calls.get(name, 0) + 1
+            run = self.current_run
+            if run is not None:
+                run["phases"][name] = run["phases"].get(name, 0.0) + own
+
+    @contextmanager
+    def phases(self, on_phase=None):
+        """
+        fase berurutan: tiap pemanggilan switch(name, label) menutup fase sebelumnya
+        label (opsional) diteruskan ke on_phase untuk laporan progress
+        """
+        current = []
+
+        def switch(name, label=None):
+            if current:
+                current.pop().__exit__(None, None, None)
+            if on_phase and label:
+                on_phase(label)
+            cm = self.phase(name)
+            cm.__enter__()
+            current.append(cm)
+
+        try:
+            yield switch
+        finally:
+            if current:
+                current.pop().__exit__(None, None, None)
+
+    def record_timeout(self, step):
+        with self._lock:
+            self.timeouts[step] = self.timeouts.get(step, 0) + 1
+        run = self.current_run
+        if run is not None:
+            run["wait_timeouts"].append(step)
+
+    def count_command(self, command):
+        with self._lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+        run = self.current_run
+        if run is not None:
+            run["webdriver_commands"] += 1
+
+    @contextmanager
+    def run(self, gmaps_link):
+        """
+        satu run scraping di thread ini; dict yang di-yield diisi reviews/new oleh pemanggil
+        """
+        run = {
+            "run_id": f"{int(time.time() * 1000)}-{threading.get_ident()}",
+            "link": gmaps_link,
+            "started_at": time.time(),
+            "phases": {},
+            "webdriver_commands": 0,
+            "reviews": 0,
+            "new": 0,
+            "status": "ok",
+            "wait_timeouts": [],
+        }
+        self._local.run = run
+        start = time.perf_counter()
+        try:
+            yield run
+        except BaseException:
+            run["status"] = "error"
+            raise
+        finally:
+            self._local.run = None
+            run["seconds"] = time.perf_counter() - start
+            run["reviews_per_second"] = run["reviews"] / run["seconds"] if run["seconds"] else 0.0
+            self.record_run(run)
+
+    def record_run(self, run):
+        with self._lock:
+            self.reviews += run["reviews"]
+            self.new_reviews += run["new"]
+            self.runs[run["status"]] = self.runs.get(run["status"], 0) + 1
+            self.last_run = run
+            prom = self.prometheus_text()
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(run, default=float) + "\n")
+            # tulis atomik supaya scraper prometheus (node_exporter textfile) tidak membaca file setengah jadi
+            tmp = self.prom_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(prom)
+            os.replace(tmp, self.prom_path)
+        except OSError as e:
+            print(f"⚠️ Gagal menulis metrik scraping: {e}")
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP gmaps_phase_seconds_total Exclusive wall time spent per scrape phase.",
+            "# TYPE gmaps_phase_seconds_total counter",
+        ]
+        lines += [f'gmaps_phase_seconds_total{{phase="{k}"}} {v:.6f}' for k, v in sorted(self.phase_seconds.items())]
+        lines += ["# HELP gmaps_phase_calls_total Number of times each phase ran.", "# TYPE gmaps_phase_calls_total counter"]
+        lines += [f'gmaps_phase_calls_total{{phase="{k}"}} {v}' for k, v in sorted(self.phase_calls.items())]
+        lines += ["# HELP gmaps_webdriver_commands_total WebDriver commands issued by pooled sessions.",
+                  "# TYPE gmaps_webdriver_commands_total counter"]
+        lines += [f'gmaps_webdriver_commands_total{{command="{k}"}} {v}' for k, v in sorted(self.commands.items())]
+        lines += ["# HELP gmaps_wait_timeouts_total Navigation readiness waits that hit their timeout.",
+                  "# TYPE gmaps_wait_timeouts_total counter"]
+        lines += [f'gmaps_wait_timeouts_total{{step="{k}"}} {v}' for k, v in sorted(self.timeouts.items())]
+        lines += ["# HELP gmaps_reviews_processed_total Reviews harvested (all ratings).",
+                  "# TYPE gmaps_reviews_processed_total counter",
+                  f"gmaps_reviews_processed_total {self.reviews}",
+                  "# HELP gmaps_reviews_new_total Low-rating reviews written to the store.",
+                  "# TYPE gmaps_reviews_new_total counter",
+                  f"gmaps_reviews_new_total {self.new_reviews}",
+                  "# HELP gmaps_scrape_runs_total Scrape runs by status.",
+                  "# TYPE gmaps_scrape_runs_total counter"]
+        lines += [f'gmaps_scrape_runs_total{{status="{k}"}} {v}' for k, v in sorted(self.runs.items())]
+        if self.last_run:
+            lines += ["# HELP gmaps_last_run_reviews_per_second Throughput of the most recent run.",
+                      "# TYPE gmaps_last_run_reviews_per_second gauge",
+                      f"gmaps_last_run_reviews_per_second {self.last_run['reviews_per_second']:.6f}"]
+        return "\n".join(lines) + "\n"
+
+
+@st.cache_resource
+def get_scrape_metrics():
+    return ScrapeMetrics()
+
+
+def metered(phase):
+    # decorator: seluruh pemanggilan fungsi dicatat sebagai satu fase
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_scrape_metrics().phase(phase):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def metered_sleep(seconds):
+    # sleep tetap dicatat terpisah supaya terlihat berapa porsi waktu yang hanya menunggu
+    with get_scrape_metrics().phase("sleep"):
+        time.sleep(seconds)
+
+
+def instrument_driver(driver):
+    """
+    bungkus driver.execute supaya setiap perintah webdriver (round-trip http ke chromedriver) terhitung
+    """
+    execute = driver.execute
+    metrics = get_scrape_metrics()
+
+    def counted(driver_command, params=None):
+        metrics.count_command(driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted
+    return driver
+
+
+# ---------- pool webdriver (sesi chrome headless yang tetap hangat) ----------
+DRIVER_POOL_SIZE = int(os.environ.get("GMAPS_DRIVER_POOL_SIZE", "2"))
+DRIVER_MAX_USES = int(os.environ.get("GMAPS_DRIVER_MAX_USES", "20"))
+# 0 mematikan warm-up pool saat startup (mis. benchmark rerun tanpa browser)
+POOL_WARM_UP = os.environ.get("GMAPS_POOL_WARM_UP", "1") != "0"
+
+
+@functools.lru_cache(maxsize=1)
+def chromedriver_path():
+    # ChromeDriverManager().install() cukup di-resolve sekali per proses
+    return ChromeDriverManager().install()
+
+
+def chrome_service():
+    return Service(chromedriver_path())
+
+
+# profil blokir resource untuk sesi scraping headless
+# urls: pola wildcard untuk cdp Network.setBlockedURLs, prefs: content settings chrome
+RESOURCE_BLOCK_PROFILES = {
+    "off": {"urls": [], "prefs": {}},
+    "lean": {
+        "urls": [
+            # tile peta dan street view
+            "*/maps/vt*", "*khms*.google.com/*", "*streetviewpixels*",
+            # avatar reviewer dan foto review
+            "*googleusercontent.com/*", "*ggpht.com/*",
+            # web font
+            "*fonts.gstatic.com/*", "*fonts.googleapis.com/*", "*.woff", "*.woff2", "*.ttf",
+            # gambar lain
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg",
+        ],
+        "prefs": {"profile.managed_default_content_settings.images": 2},
+    },
+}
+RESOURCE_BLOCK_PROFILE = os.environ.get("GMAPS_BLOCK_PROFILE", "lean")
+
+
+def apply_block_profile(driver, profile):
+    urls = RESOURCE_BLOCK_PROFILES[profile]["urls"]
+    if not urls:
+        return
+    # blokir berlaku untuk semua navigasi berikutnya di tab ini
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+
+
+def headless_chrome_options(capture_network=False, block_profile="off"):
+    options = Options()
+    prefs = RESOURCE_BLOCK_PROFILES[block_profile]["prefs"]
+    if prefs:
+        options.add_experimental_option("prefs", prefs)
+    if capture_network:
+        # performance log berisi event Network.* devtools (dipakai benchmark byte jaringan)
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--log-level=3")
+    return options
+
+
+class DriverPoolBusy(RuntimeError):
+    pass
+
+
+# ui tidak boleh menunggu slot yang sedang dipakai job scraping di background
+UI_POOL_TIMEOUT_SECONDS = float(os.environ.get("GMAPS_UI_POOL_TIMEOUT", "3"))
+
+
+class DriverPool:
+    """
+    menyimpan N sesi chrome headless yang sudah berisi cookies
+    sesi dicek kesehatannya sebelum dipinjamkan dan di-recycle setelah max_uses
+    reset() menaikkan generasi: sesi dari generasi lama (termasuk yang sedang dipinjam) dibuang saat kembali
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES, capture_network=False,
+                 block_profile=RESOURCE_BLOCK_PROFILE):
+        self.size = size
+        self.max_uses = max_uses
+        self.capture_network = capture_network
+        self.block_profile = block_profile
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._uses = {}
+        self._born = {}
+        self._generation = 0
+        self._live = 0
+        self._lock = threading.Lock()
+
+    def _new_driver(self):
+        metrics = get_scrape_metrics()
+        generation = self._generation
+        with metrics.phase("driver_startup"):
+            driver = instrument_driver(webdriver.Chrome(
+                service=chrome_service(),
+                options=headless_chrome_options(self.capture_network, self.block_profile),
+            ))
+            with self._lock:
+                self._live += 1
+            try:
+                apply_block_profile(driver, self.block_profile)
+            except WebDriverException as e:
+                print(f"⚠️ Gagal menerapkan profil blokir {self.block_profile}: {e}")
+        cookies = load_cookies()
+        if cookies:
+            try:
+                with metrics.phase("apply_cookies"):
+                    apply_cookies_to_driver(driver, cookies)
+            except Exception as e:
+                print(f"⚠️ Gagal apply cookies ke sesi pool: {e}")
+        self._uses[id(driver)] = 0
+        self._born[id(driver)] = generation
+        return driver
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _stale(self, driver):
+        return self._born.get(id(driver)) != self._generation
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        self._born.pop(id(driver), None)
+        with self._lock:
+            self._live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def warm_up(self):
+        # buka sesi sampai pool penuh supaya pemanggil pertama tidak cold start
+        # sesi yang sedang dipinjam ikut dihitung, jadi aman dijalankan bersamaan dengan scraping
+        while self._live < self.size:
+            self._idle.put(self._new_driver())
+
+    def acquire(self, timeout=None):
+        # timeout=None menunggu slot tanpa batas (scraping); ui memakai timeout pendek
+        if not self._slots.acquire(timeout=timeout):
+            raise DriverPoolBusy(f"semua {self.size} sesi chrome sedang dipakai")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_driver()
+                if not self._stale(driver) and self._healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        try:
+            self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+            # sesi dari sebelum reset() masih memakai cookies lama; kelebihan sesi dari warm-up paralel ikut dibuang
+            if broken or self._stale(driver) or self._uses[id(driver)] >= self.max_uses or self._live > self.size:
+                self._discard(driver)
+                return
+            try:
+                # kosongkan halaman supaya memori tab lama dilepas
+                driver.get("about:blank")
+                self._idle.put(driver)
+            except Exception:
+                self._discard(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self, timeout=None):
+        driver = self.acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def reset(self):
+        # dipanggil setelah login ulang supaya sesi baru memakai cookies terbaru
+        # sesi yang sedang dipinjam ditandai basi lewat generasi dan dibuang saat dikembalikan
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    close = reset
+
+
+@st.cache_resource
+def _shared_driver_pool(block_profile):
+    return DriverPool(block_profile=block_profile)
+
+
+def get_driver_pool():
+    # cache_resource memakai argumen apa adanya sebagai kunci: selalu panggil dengan bentuk yang sama
+    # supaya warm-up, panel distribusi, scraping dan reset berbagi pool yang sama
+    return _shared_driver_pool(RESOURCE_BLOCK_PROFILE)
+
+
+def _warm_up_pool(pool):
+    try:
+        pool.warm_up()
+    except Exception as e:
+        print(f"⚠️ Gagal memanaskan pool chrome: {e}")
+
+
+@st.cache_resource
+def start_pool_warm_up():
+    """
+    panaskan pool bersama di background sekali per proses streamlit
+    scrape atau panel distribusi pertama tidak perlu menunggu chrome start
+    """
+    thread = threading.Thread(target=_warm_up_pool, args=(get_driver_pool(),), name="driver-pool-warm-up",
+                              daemon=True)
+    thread.start()
+    return thread
+
+
+CLASSIFY_BATCH_SIZE = int(os.environ.get("GMAPS_CLASSIFY_BATCH_SIZE", "64"))
+
+
+def encode_texts(texts, batch_size=CLASSIFY_BATCH_SIZE):
+    """
+    encode list teks dengan length bucketing: diurutkan berdasarkan panjang
+    sehingga tiap batch berisi teks dengan panjang mirip dan padding minimal
+    hasil dikembalikan sesuai urutan input
+    """
+    model, _ = load_semantic_model()
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings = np.zeros((len(texts), model.get_sentence_embedding_dimension()), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        bucket = order[start:start + batch_size]
+        embeddings[bucket] = model.encode(
+            [texts[i] for i in bucket], batch_size=batch_size, convert_to_numpy=True
+        )
+    return embeddings
+
+
+# ---------- cache embedding persisten di disk ----------
+class EmbeddingCache:
+    """
+    cache embedding per (nama model, hash teks)
+    vektor disimpan di matriks float32 memory-mapped, index slot + waktu akses di sqlite
+    jika penuh, slot yang paling lama tidak dipakai (LRU) ditimpa
+    """
+
+    def __init__(self, model_name, dim, directory=EMBEDDING_CACHE_DIR, max_rows=EMBEDDING_CACHE_MAX_ROWS):
+        os.makedirs(directory, exist_ok=True)
+        self.model_name = model_name
+        self.dim = dim
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.db_path = os.path.join(directory, "index.sqlite")
+        self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text_hash TEXT NOT NULL, slot INTEGER NOT NULL,"
+            " last_used REAL NOT NULL, PRIMARY KEY (model, text_hash))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_lru ON embeddings (model, last_used)")
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self.matrix_path = os.path.join(directory, f"{safe_name}-{dim}.f32")
+        expected_size = max_rows * dim * 4
+        if os.path.exists(self.matrix_path) and os.path.getsize(self.matrix_path) == expected_size:
+            mode = "r+"
+        else:
+            # ukuran berubah (max_rows / dim beda): mulai ulang cache model ini
+            mode = "w+"
+            self.db.execute("DELETE FROM embeddings WHERE model = ?", (model_name,))
+            self.db.commit()
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode=mode, shape=(max_rows, dim))
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _lookup_slots(self, hashes):
+        # dipecah per 500 agar tidak melewati batas parameter sqlite
+        found = {}
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.db.execute(
+                f"SELECT text_hash, slot FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                (self.model_name, *chunk),
+            ).fetchall()
+            found.update(rows)
+        return found
+
+    def get_many(self, texts):
+        """
+        return (vectors, missing) — vectors berisi None untuk teks yang belum ada di cache
+        """
+        hashes = [self.text_hash(t) for t in texts]
+        with self._lock:
+            found = self._lookup_slots(hashes)
+            if found:
+                now = time.time()
+                self.db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model_name, h) for h in found],
+                )
+                self.db.commit()
+            vectors = [np.array(self.matrix[found[h]]) if h in found else None for h in hashes]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        return vectors, missing
+
+    def _allocate_slots(self, count):
+        used = self.db.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)).fetchone()[0]
+        fresh = list(range(used, min(used + count, self.max_rows)))
+        evict = count - len(fresh)
+        if evict > 0:
+            rows = self.db.execute(
+                "SELECT text_hash, slot FROM embeddings WHERE model = ? ORDER BY last_used LIMIT ?",
+                (self.model_name, evict),
+            ).fetchall()
+            self.db.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND text_hash = ?",
+                [(self.model_name, h) for h, _ in rows],
+            )
+            fresh.extend(slot for _, slot in rows)
+        return fresh
+
+    def put_many(self, texts, vectors):
+        # teks duplikat dalam satu batch cukup disimpan sekali
+        unique = {}
+        for text, vector in zip(texts, vectors):
+            unique.setdefault(self.text_hash(text), vector)
+        with self._lock:
+            # lewati hash yang sudah tersimpan supaya slot tidak tertimpa ganda
+            existing = self._lookup_slots(list(unique))
+            unique = {h: v for h, v in unique.items() if h not in existing}
+            unique = dict(list(unique.items())[-self.max_rows:])
+            if not unique:
+                return
+            slots = self._allocate_slots(len(unique))
+            now = time.time()
+            for slot, vector in zip(slots, unique.values()):
+                self.matrix[slot] = vector
+            self.matrix.flush()
+            self.db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, slot, last_used) VALUES (?, ?, ?, ?)",
+                [(self.model_name, h, slot, now) for h, slot in zip(unique, slots)],
+            )
+            self.db.commit()
+
+    def stats(self):
+        with self._lock:
+            rows = self.db.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)).fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": rows,
+            "capacity": self.max_rows,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_used": rows * self.dim * 4 + os.path.getsize(self.db_path),
+        }
+
+
+@st.cache_resource
+def get_embedding_cache():
+    model, _ = load_semantic_model()
+    return EmbeddingCache(semantic_model_key(), model.get_sentence_embedding_dimension())
+
+
+def cached_encode(texts, batch_size=CLASSIFY_BATCH_SIZE):
+    """
+    cek cache disk dulu, hanya cache miss yang dikirim ke SentenceTransformer.encode
+    """
+    cache = get_embedding_cache()
+    vectors, missing = cache.get_many(texts)
+    if missing:
+        encoded = encode_texts([texts[i] for i in missing], batch_size=batch_size)
+        cache.put_many([texts[i] for i in missing], encoded)
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+    return np.vstack(vectors).astype(np.float32, copy=False)
+
+
+@metered("classify")
+def classify_report_categories(texts, batch_size=CLASSIFY_BATCH_SIZE):
+    """
+    versi batch dari classify_report_category untuk list atau pandas Series
+    return (labels, scores) berupa numpy array, skor dalam persen
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).tolist()
+    labels = np.full(len(texts), "Other", dtype=object)
+    scores = np.zeros(len(texts), dtype=np.float64)
+
+    valid = [i for i, t in enumerate(texts) if len(t.strip()) >= 3]
+    if not valid:
+        return labels, scores
+
+    _, category_embeddings = load_semantic_model()
+    embeddings = normalize_rows(cached_encode([texts[i] for i in valid], batch_size=batch_size))
+    # cosine similarity semua review vs semua kategori dalam satu perkalian matriks
+    sims = embeddings @ category_embeddings.T
+    best = sims.argmax(axis=1)
+    labels[valid] = np.asarray(report_categories, dtype=object)[best]
+    scores[valid] = np.round(sims[np.arange(len(valid)), best] * 100, 2)
+    return labels, scores
+
+
+def classify_report_category(review_text):
+    labels, scores = classify_report_categories([review_text])
+    return labels[0], float(scores[0])
+
+
+def clean_review_text_en(text):
+    if not text:
+        return ""
+    text = emoji.replace_emoji(text, replace="")
+    text = text.lower()
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text)
+    text = re.sub(r"[^a-z0-9\s.,!?']", " ", text)
+    words = text.split()
+    filtered_words = [w for w in words if w not in stop_words]
+    return " ".join(filtered_words).strip()
+
+# ---------- cleaning batch (vectorized) ----------
+# satu regex untuk url + filter karakter: url dihapus, karakter di luar charset diganti spasi
+# hasilnya identik dengan dua re.sub berurutan di clean_review_text_en
+_URL_OR_CHARSET_RE = re.compile(r"(http\S+|www\S+|https\S+)|[^a-z0-9\s.,!?']")
+
+
+def _url_or_charset(match):
+    return "" if match.group(1) else " "
+
+
+def _clean_review_text_fast(text):
+    if not text:
+        return ""
+    # teks ascii pasti tidak berisi emoji, jadi emoji.replace_emoji bisa dilewati
+    if not text.isascii():
+        text = emoji.replace_emoji(text, replace="")
+    text = _URL_OR_CHARSET_RE.sub(_url_or_charset, text.lower())
+    return " ".join(w for w in text.split() if w not in stop_words)
+
+
+def clean_review_texts(texts):
+    """
+    versi batch dari clean_review_text_en untuk pandas Series / list
+    setiap teks unik hanya dibersihkan sekali, output identik dengan fungsi per-review
+    """
+    series = pd.Series(texts, dtype=object)
+    valid = series.dropna()
+    mapping = {t: _clean_review_text_fast(t) for t in pd.unique(valid)}
+    return series.map(mapping).fillna("")
+
+
+# ---------- helper parse tanggal relatif (english + indonesia) ----------
+_DATE_UNITS = {
+    "second": "seconds", "minute": "minutes", "hour": "hours", "day": "days",
+    "week": "weeks", "month": "months", "year": "years",
+    "detik": "seconds", "menit": "minutes", "jam": "hours", "hari": "days",
+    "minggu": "weeks", "bulan": "months", "tahun": "years",
+}
+# "3 weeks ago", "a week ago", "an hour ago", "2 minggu lalu", "sebulan lalu"
+# jumlah wajib ada dan unit harus kata utuh: "Thursday" atau "menit" saja bukan tanggal
+_RELATIVE_DATE_RE = re.compile(
+    r"\b(?:(?P<num>\d+)\s*|(?P<one>an?|one|satu)\s+|(?P<se>se))"
+    r"(?P<unit>" + "|".join(_DATE_UNITS) + r")s?\b"
+)
+_ZERO_DAY_PHRASES = ("just now", "today", "baru saja", "hari ini")
+_ONE_DAY_PHRASES = ("yesterday", "kemarin")
+_MONTHS_ID = {
+    "januari": 1, "februari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6, "juli": 7,
+    "agustus": 8, "september": 9, "oktober": 10, "november": 11, "desember": 12,
+}
+
+
+class RelativeDateParser:
+    """
+    parser tanggal relatif dengan satu timestamp acuan (pinned) per scrape
+    tiap string mentah yang berbeda hanya di-parse sekali (memo)
+    hasil gagal menjadi NaT, bukan string mentah
+    """
+
+    def __init__(self, now=None):
+        self.now = pd.Timestamp(now or datetime.now())
+        self._memo = {}
+
+    def _parse(self, text):
+        text = (text or "").lower().strip()
+        if not text:
+            return pd.NaT
+        if any(p in text for p in _ZERO_DAY_PHRASES):
+            return self.now.normalize()
+        if any(p in text for p in _ONE_DAY_PHRASES):
+            return (self.now - timedelta(days=1)).normalize()
+
+        match = _RELATIVE_DATE_RE.search(text)
+        if match:
+            num = int(match.group("num")) if match.group("num") else 1
+            unit = _DATE_UNITS[match.group("unit")]
+            if unit == "months":
+                delta = timedelta(days=30 * num)
+            elif unit == "years":
+                delta = timedelta(days=365 * num)
+            else:
+                delta = timedelta(**{unit: num})
+            return (self.now - delta).normalize()
+
+        # format absolut: "March 2020" / "Maret 2020"
+        try:
+            return pd.Timestamp(datetime.strptime(text, "%B %Y"))
+        except ValueError:
+            pass
+        parts = text.split()
+        if len(parts) == 2 and parts[0] in _MONTHS_ID and parts[1].isdigit():
+            return pd.Timestamp(year=int(parts[1]), month=_MONTHS_ID[parts[0]], day=1)
+        return pd.NaT
+
+    def parse(self, text):
+        if text not in self._memo:
+            self._memo[text] = self._parse(text)
+        return self._memo[text]
+
+    def parse_series(self, values):
+        """
+        map setiap string unik sekali lalu terapkan ke seluruh kolom -> datetime64 (NaT jika gagal)
+        """
+        series = pd.Series(values, dtype=object)
+        mapping = {v: self.parse(v) for v in pd.unique(series.dropna())}
+        return pd.to_datetime(series.map(mapping), errors="coerce")
+
+
+# ---------- ekstraksi review dalam satu round-trip ----------
+# klik semua tombol "More" sekaligus lalu baca seluruh blok review dalam satu
+# execute_script, jadi tidak ada find_element per review
+# jika onlyNew aktif, blok yang sudah dipanen ditandai data-harvested dan dilewati
+JS_EXTRACT_REVIEWS = """
+const root = arguments[0] || document;
+const expand = arguments[1];
+const settleMs = arguments[2];
+const onlyNew = arguments[3];
+const prune = arguments[4];
+const selector = onlyNew ? ".jftiEf:not([data-harvested])" : ".jftiEf";
+const blocks = Array.from(root.querySelectorAll(selector));
+
+function text(el, sel) {
+    const node = el.querySelector(sel);
+    return node ? (node.innerText || "").trim() : "";
+}
+
+function collect() {
+    return blocks.map(el => {
+        const star = el.querySelector(".kvMYJc");
+        if (onlyNew) el.setAttribute("data-harvested", "1");
+        return {
+            id: el.getAttribute("data-review-id") || "",
+            rating: star ? (star.getAttribute("aria-label") || "") : "",
+            text: text(el, ".wiI7pd"),
+            user: text(el, ".d4r55"),
+            date: text(el, ".rsqaWe"),
+            total_reviews: text(el, ".RfnDt"),
+        };
+    });
+}
+
+function harvest() {
+    const items = collect();
+    // buang node yang sudah diproses supaya DOM tidak terus membesar
+    if (prune) blocks.forEach(el => el.remove());
+    return items;
+}
+
+let clicked = 0;
+if (expand) {
+    blocks.forEach(el => el.querySelectorAll(".w8nwRe").forEach(btn => {
+        try { btn.click(); clicked++; } catch (e) {}
+    }));
+}
+if (!clicked) return harvest();
+return new Promise(resolve => setTimeout(() => resolve(harvest()), settleMs));
+"""
+
+
+@metered("extract")
+def extract_review_blocks(driver, root=None, expand=True, settle_ms=300, only_new=False, prune=False):
+    """
+    ambil semua blok review sebagai list of dict dalam satu panggilan execute_script
+    tombol "More" diklik sekaligus lalu ditunggu sekali saja selama settle_ms
+    prune=True menghapus node yang sudah dibaca dari container
+    """
+    try:
+        return driver.execute_script(JS_EXTRACT_REVIEWS, root, expand, settle_ms, only_new, prune) or []
+    except WebDriverException as e:
+        print(f"⚠️ Gagal ekstraksi review: {e}")
+        return []
+
+
+# ---------- scroll berbasis event (MutationObserver) ----------
+# scroll ke bawah lalu tunggu sampai jumlah .jftiEf bertambah atau timeout
+# hasilnya {count, elapsed, timedOut} supaya python bisa menyesuaikan waktu tunggu
+JS_SCROLL_AND_WAIT = """
+const container = arguments[0];
+const prevCount = arguments[1];
+const timeoutMs = arguments[2];
+const count = () => container.querySelectorAll(".jftiEf").length;
+const start = performance.now();
+container.scrollTop = container.scrollHeight;
+
+return new Promise(resolve => {
+    let timer = null;
+    const done = (timedOut) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        resolve({count: count(), elapsed: performance.now() - start, timedOut: timedOut});
+    };
+    const observer = new MutationObserver(() => {
+        if (count() > prevCount) done(false);
+    });
+    if (count() > prevCount) {
+        resolve({count: count(), elapsed: 0, timedOut: false});
+        return;
+    }
+    observer.observe(container, {childList: true, subtree: true});
+    timer = setTimeout(() => done(true), timeoutMs);
+});
+"""
+
+SCROLL_MIN_WAIT = 1.5   # detik
+SCROLL_MAX_WAIT = 10.0  # detik
+SCROLL_MAX_STALLS = 3   # timeout berturut-turut sebelum dianggap habis
+
+
+JS_COUNT_REVIEWS = "return arguments[0].querySelectorAll('.jftiEf').length"
+
+
+class ScrollPacer:
+    """
+    waktu tunggu scroll yang adaptif: EWMA dari latensi load, digandakan saat timeout
+    """
+
+    def __init__(self):
+        self.latency = SCROLL_MIN_WAIT / 3
+        self.stalls = 0
+
+    def timeout_ms(self):
+        return int(min(max(self.latency * 4, SCROLL_MIN_WAIT), SCROLL_MAX_WAIT) * 1000)
+
+    def observe(self, res):
+        if res["timedOut"]:
+            self.stalls += 1
+            # halaman lambat, beri waktu lebih lama di percobaan berikutnya
+            self.latency = min(self.latency * 2, SCROLL_MAX_WAIT)
+        else:
+            self.stalls = 0
+            # exponential moving average dari latensi load
+            self.latency = 0.7 * self.latency + 0.3 * (res["elapsed"] / 1000)
+        return not res["timedOut"]
+
+    @property
+    def exhausted(self):
+        return self.stalls >= SCROLL_MAX_STALLS
+
+
+def iter_review_batches(driver, scrollable_div, max_scrolls=10000, batch_size=50, prune=False, deadline=None,
+                        stop_event=None, target=None):
+    """
+    scroll engine yang menunggu pertumbuhan node .jftiEf, bukan sleep tetap
+    waktu tunggu adaptif mengikuti rata-rata latensi load halaman
+    review baru dipanen per batch selama scroll berjalan
+    deadline (time.monotonic) atau stop_event (threading.Event) menghentikan scroll lebih awal,
+    hasil yang sudah ada tetap dipanen
+    target: jumlah review yang perlu dimuat; scroll berhenti tepat saat tercapai
+    """
+    count = driver.execute_script(JS_COUNT_REVIEWS, scrollable_div)
+    pending = count
+    loaded = count
+    pacer = ScrollPacer()
+
+    for _ in range(max_scrolls):
+        if target is not None and loaded >= target:
+            # semua review yang dibutuhkan sudah dimuat, termasuk kalau halaman pertama sudah cukup
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if stop_event is not None and stop_event.is_set():
+            break
+        try:
+            res = driver.execute_script(JS_SCROLL_AND_WAIT, scrollable_div, count, pacer.timeout_ms())
+        except WebDriverException as e:
+            print(f"⚠️ Scroll gagal: {e}")
+            break
+
+        if not pacer.observe(res):
+            if pacer.exhausted:
+                break
+            continue
+
+        pending += res["count"] - count
+        loaded += res["count"] - count
+        count = res["count"]
+
+        if pending >= batch_size:
+            yield extract_review_blocks(driver, scrollable_div, only_new=True, prune=prune)
+            pending = 0
+            if prune:
+                # node lama sudah dibuang, hitung ulang sebagai acuan pertumbuhan
+                count = driver.execute_script(JS_COUNT_REVIEWS, scrollable_div)
+
+    # sisa review yang belum dipanen
+    yield extract_review_blocks(driver, scrollable_div, only_new=True, prune=prune)
+
+
+def parse_rating_label(label):
+    # contoh aria-label: "1 star" / "2 bintang"
+    try:
+        return float(label.split()[0].replace(",", "."))
+    except Exception:
+        return 0
+
+
+def review_key(place_key, item):
+    """
+    kunci dedupe yang stabil: id review google jika ada, jika tidak user + hash teks
+    tanggal tidak dipakai karena formatnya relatif ("2 weeks ago") dan berubah tiap hari
+    """
+    if item.get("id"):
+        raw = f"{place_key}|id:{item['id']}"
+    else:
+        raw = f"{place_key}|{item.get('user') or ''}|{item.get('text') or ''}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# rating yang dikumpulkan bila tidak ditentukan lain
+DEFAULT_RATINGS = (1.0, 2.0)
+# incremental berhenti di review yang lebih tua dari job terakhir dikurangi margin ini
+INCREMENTAL_DATE_MARGIN = timedelta(days=7)
+
+
+def rating_cutoff(blocks, ratings=DEFAULT_RATINGS):
+    """
+    index review pertama dengan rating di atas max(ratings), None kalau belum ada
+    dengan urutan "Lowest rating" semua review sesudahnya juga di atas batas
+    label yang tidak bisa dibaca (rating 0) tidak memicu berhenti
+    """
+    ceiling = max(ratings)
+    return next(
+        (i for i, item in enumerate(blocks) if parse_rating_label(item.get("rating") or "") > ceiling),
+        None,
+    )
+
+
+def truncate_batch(blocks, keys, known=None, ratings=None):
+    """
+    potong satu batch hasil panen sebelum diproses, return (blocks, keys, stop)
+    known(item): berhenti di review pertama yang sudah tercakup scrape sebelumnya (incremental)
+    ratings: berhenti di review pertama di atas batas rating (hanya untuk urutan lowest)
+    """
+    cut = None
+    if known:
+        cut = next((i for i, item in enumerate(blocks) if known(item)), None)
+    if ratings:
+        ceiling_at = rating_cutoff(blocks, ratings)
+        if ceiling_at is not None and (cut is None or ceiling_at < cut):
+            cut = ceiling_at
+    if cut is None:
+        return blocks, keys, False
+    return blocks[:cut], keys[:cut], True
+
+
+@metered("build_rows")
+def build_review_rows(blocks, place_name, place_key="", date_parser=None, ratings=DEFAULT_RATINGS):
+    """
+    loop python hanya untuk cleaning dan filter rating
+    date_parser dibagi satu scrape supaya acuan waktunya sama dan string tanggal di-memo
+    """
+    date_parser = date_parser or RelativeDateParser()
+    data = []
+    for item in blocks:
+        rating_value = parse_rating_label(item.get("rating") or "")
+        if rating_value not in ratings:
+            continue
+        date_txt = item.get("date") or ""
+        data.append({
+            "Place": place_name,
+            "User": item.get("user") or "",
+            "Total Reviews": item.get("total_reviews") or "",
+            "Rating": rating_value,
+            "Date (Raw)": date_txt,
+            "Date (Parsed)": date_parser.parse(date_txt),
+            "Review Text": _clean_review_text_fast(item.get("text") or ""),
+            "Review Key": review_key(place_key, item),
+        })
+    return data
+
+
+# ---------- budget scroll dari jumlah review di histogram ----------
+# google maps memuat sekitar 10 review per scroll; budget diberi margin untuk scroll yang tidak menambah review
+REVIEWS_PER_SCROLL = 10
+SCROLL_BUDGET_FACTOR = 1.5
+SCROLL_BUDGET_SLACK = 5
+
+
+def review_targets(distribusi, ratings=DEFAULT_RATINGS, sort="lowest"):
+    """
+    dari histogram {bintang: jumlah}: return (expected, need)
+    expected: review dengan rating terpilih yang akan disimpan
+    need: review yang harus dimuat scroll untuk mencapainya (semua review untuk sort selain lowest)
+    (None, None) kalau histogram tidak terbaca
+    """
+    if not distribusi:
+        return None, None
+    stars = {int(r) for r in ratings}
+    expected = sum(n for star, n in distribusi.items() if star in stars)
+    if sort == "lowest":
+        need = sum(n for star, n in distribusi.items() if star <= max(stars))
+    else:
+        need = sum(distribusi.values())
+    return expected, need
+
+
+def scroll_budget(need, max_scrolls=10000):
+    if need is None:
+        return max_scrolls
+    return min(max_scrolls, int(need * SCROLL_BUDGET_FACTOR / REVIEWS_PER_SCROLL) + SCROLL_BUDGET_SLACK)
+
+
+# ---------- distribusi rating (cache ber-TTL per url tempat) ----------
+DISTRIBUTION_TTL_SECONDS = 30 * 60
+
+JS_RATING_LABELS = """
+return Array.from(document.querySelectorAll("tr.BHOKXe")).map(r => r.getAttribute("aria-label") || "");
+"""
+
+_DIST_LABEL_RE = re.compile(r"^\s*(\d)\D*?,\s*([\d.,\s]+)")
+
+
+def read_rating_distribution(driver):
+    """
+    baca histogram bintang dari tabel <tr class="BHOKXe"> dalam satu execute_script
+    contoh label: "5 stars, 1,182 reviews" / "5 bintang, 1.182 ulasan"
+    """
+    try:
+        labels = driver.execute_script(JS_RATING_LABELS) or []
+    except WebDriverException:
+        return {}
+    distribusi = {}
+    for label in labels:
+        match = _DIST_LABEL_RE.match(label)
+        if match:
+            digits = re.sub(r"\D", "", match.group(2))
+            if digits:
+                distribusi[int(match.group(1))] = int(digits)
+    return distribusi
+
+
+@st.cache_resource
+def _distribution_store():
+    # dibagi antar sesi streamlit: {url: (timestamp, resolved_url, distribusi)}
+    return {}
+
+
+def remember_rating_distribution(gmaps_link, resolved_url, distribusi):
+    entry = (time.time(), resolved_url, distribusi)
+    store = _distribution_store()
+    store[gmaps_link.strip()] = entry
+    store[resolved_url] = entry
+
+
+def get_rating_distribution(gmaps_link, ttl=DISTRIBUTION_TTL_SECONDS):
+    """
+    ambil distribusi rating dari cache (termasuk hasil sesi scraping)
+    browser hanya dibuka jika cache kosong atau sudah lewat ttl
+    DriverPoolBusy kalau semua sesi pool sedang dipakai scraping lebih dari UI_POOL_TIMEOUT_SECONDS
+    """
+    entry = _distribution_store().get(gmaps_link.strip())
+    if entry and time.time() - entry[0] < ttl:
+        return entry[2]
+
+    with get_driver_pool().session(timeout=UI_POOL_TIMEOUT_SECONDS) as driver:
+        # redirect maps.app.goo.gl diikuti browser; header tempat hanya muncul di halaman maps tujuan
+        driver.get(gmaps_link)
+        wait_until(driver, "place_header", EC.presence_of_element_located(PLACE_HEADER))
+        distribusi = read_rating_distribution(driver)
+        if distribusi:
+            # histogram kosong (halaman belum siap / diblokir) tidak di-cache supaya rerun berikutnya mencoba lagi
+            remember_rating_distribution(gmaps_link, driver.current_url, distribusi)
+    return distribusi
+
+
+# ---------- penyimpanan review persisten (sqlite) ----------
+REVIEW_DB_PATH = os.environ.get("GMAPS_REVIEW_DB", os.path.abspath("reviews.sqlite"))
+
+# kolom dataframe -> kolom tabel
+REVIEW_COLUMNS = {
+    "Review Key": "review_key",
+    "Place Key": "place_key",
+    "Place": "place",
+    "User": "user",
+    "Total Reviews": "total_reviews",
+    "Rating": "rating",
+    "Date (Raw)": "date_raw",
+    "Date (Parsed)": "date_parsed",
+    "Review Text": "review_text",
+}
+
+
+def place_key_for(gmaps_link):
+    return (gmaps_link or "").strip()
+
+
+class ReviewStore:
+    """
+    review hasil scraping disimpan per tempat dengan kunci dedupe stabil (review_key)
+    tabel seen mencatat semua review yang pernah terlihat (semua rating)
+    sebagai titik berhenti untuk scraping incremental
+    """
+
+    def __init__(self, path=REVIEW_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        columns = ", ".join(f"{c} TEXT" for c in REVIEW_COLUMNS.values() if c not in ("review_key", "rating"))
+        self.db.execute(
+            f"CREATE TABLE IF NOT EXISTS reviews (review_key TEXT PRIMARY KEY, rating REAL, {columns}, scraped_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_reviews_place ON reviews (place_key)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews (place_key, date_parsed)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (place_key TEXT NOT NULL, review_key TEXT NOT NULL,"
+            " first_seen REAL, PRIMARY KEY (place_key, review_key))"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, place_key TEXT, sort TEXT, status TEXT,"
+            " harvested INTEGER DEFAULT 0, last_key TEXT, started_at REAL, updated_at REAL)"
+        )
+        # kolom tambahan untuk database lama: rating review yang terlihat dan rating yang dicari job
+        self._add_column("seen", "rating", "REAL")
+        self._add_column("jobs", "ratings", "TEXT")
+        self.db.commit()
+
+    def _add_column(self, table, column, sql_type):
+        columns = {row[1] for row in self.db.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            self.db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}")
+
+    @staticmethod
+    def _ratings_text(ratings):
+        return ",".join(str(float(r)) for r in sorted(ratings))
+
+    @staticmethod
+    def _ratings_from_text(text):
+        # job sebelum rating bisa dipilih selalu memakai DEFAULT_RATINGS
+        return {float(r) for r in text.split(",")} if text else set(DEFAULT_RATINGS)
+
+    def upsert(self, place_key, rows):
+        if not rows:
+            return 0
+        cols = list(REVIEW_COLUMNS.values()) + ["scraped_at"]
+        now = time.time()
+        values = [
+            tuple(place_key if c == "place_key" else self._sql_value(row.get(k)) for k, c in REVIEW_COLUMNS.items())
+            + (now,)
+            for row in rows
+        ]
+        keys = {v[0] for v in values}
+        # update di tempat (bukan REPLACE) supaya rowid dan urutan load_place tetap
+        updates = ", ".join(f"{c} = excluded.{c}" for c in cols if c != "review_key")
+        with self._lock:
+            existing = set()
+            key_list = list(keys)
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                existing.update(
+                    k for (k,) in self.db.execute(
+                        f"SELECT review_key FROM reviews WHERE review_key IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                )
+            self.db.executemany(
+                f"INSERT INTO reviews ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+                f" ON CONFLICT(review_key) DO UPDATE SET {updates}",
+                values,
+            )
+            self.db.commit()
+        # hanya review yang belum pernah tersimpan dihitung baru
+        return len(keys - existing)
+
+    @staticmethod
+    def _sql_value(value):
+        # tanggal disimpan sebagai iso "YYYY-MM-DD" supaya query rentang tanggal bisa pakai index
+        if isinstance(value, (pd.Timestamp, datetime)):
+            return None if pd.isna(value) else value.strftime("%Y-%m-%d")
+        if value is pd.NaT:
+            return None
+        return value
+
+    def mark_seen(self, place_key, keys, ratings):
+        now = time.time()
+        with self._lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO seen (place_key, review_key, first_seen, rating) VALUES (?, ?, ?, ?)",
+                [(place_key, k, now, r) for k, r in zip(keys, ratings)],
+            )
+            self.db.commit()
+
+    def captured_keys(self, place_key, ratings):
+        """
+        review yang tidak perlu diproses ulang untuk rating ini:
+        sudah tersimpan, atau sudah terlihat dengan rating di luar set yang dicari
+        review yang terlihat tanpa rating tercatat (database lama) tidak dianggap tertangkap
+        """
+        ratings = sorted({float(r) for r in ratings})
+        marks = ", ".join("?" * len(ratings))
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT review_key FROM seen WHERE place_key = ? AND rating IS NOT NULL AND rating NOT IN ({marks})"
+                " UNION SELECT review_key FROM reviews WHERE place_key = ?",
+                [place_key, *ratings, place_key],
+            ).fetchall()
+        return {k for (k,) in rows}
+
+    def covered_since(self, place_key, ratings):
+        """
+        waktu mulai job selesai terakhir yang mencakup semua rating ini (pd.Timestamp), None kalau belum ada
+        semua review dengan rating tersebut yang diposting sebelum waktu itu sudah tersimpan
+        """
+        wanted = {float(r) for r in ratings}
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT started_at, ratings FROM jobs WHERE place_key = ? AND status = 'done'", (place_key,)
+            ).fetchall()
+        covering = [started for started, text in rows if wanted <= self._ratings_from_text(text)]
+        return pd.Timestamp(datetime.fromtimestamp(max(covering))) if covering else None
+
+    # ---------- checkpoint job scraping ----------
+    def start_job(self, job_id, place_key, sort, ratings=DEFAULT_RATINGS):
+        """
+        daftarkan job; return checkpoint lama (dict) kalau job ini belum selesai, None kalau baru
+        """
+        previous = self.get_job(job_id)
+        resumable = previous if previous and previous["status"] != "done" else None
+        now = time.time()
+        with self._lock:
+            if resumable:
+                self.db.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE job_id = ?", (now, job_id)
+                )
+            else:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, place_key, sort, status, harvested, last_key,"
+                    " started_at, updated_at, ratings) VALUES (?, ?, ?, 'running', 0, NULL, ?, ?, ?)",
+                    (job_id, place_key, sort, now, now, self._ratings_text(ratings)),
+                )
+            self.db.commit()
+        return resumable
+
+    def checkpoint_job(self, job_id, harvested, last_key):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET harvested = harvested + ?, last_key = COALESCE(?, last_key), updated_at = ?"
+                " WHERE job_id = ?",
+                (harvested, last_key, time.time(), job_id),
+            )
+            self.db.commit()
+
+    def finish_job(self, job_id, status="done"):
+        with self._lock:
+            self.db.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE job_id = ?", (status, time.time(), job_id)
+            )
+            self.db.commit()
+
+    def get_job(self, job_id):
+        with self._lock:
+            cur = self.db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+            row = cur.fetchone()
+            names = [d[0] for d in cur.description]
+        return dict(zip(names, row)) if row else None
+
+    def unfinished_jobs(self, place_key=None):
+        query = "SELECT * FROM jobs WHERE status != 'done'"
+        params = []
+        if place_key is not None:
+            query += " AND place_key = ?"
+            params.append(place_key)
+        with self._lock:
+            cur = self.db.execute(query + " ORDER BY updated_at DESC", params)
+            rows = cur.fetchall()
+            names = [d[0] for d in cur.description]
+        return [dict(zip(names, row)) for row in rows]
+
+    def load_place(self, place_key, since=None, until=None):
+        """
+        review satu tempat, opsional dibatasi rentang tanggal (inklusif)
+        """
+        query = f"SELECT {', '.join(REVIEW_COLUMNS.values())} FROM reviews WHERE place_key = ?"
+        params = [place_key]
+        if since is not None:
+            query += " AND date_parsed >= ?"
+            params.append(pd.Timestamp(since).strftime("%Y-%m-%d"))
+        if until is not None:
+            query += " AND date_parsed <= ?"
+            params.append(pd.Timestamp(until).strftime("%Y-%m-%d"))
+        with self._lock:
+            df = pd.read_sql_query(query + " ORDER BY rowid", self.db, params=params)
+        df = df.rename(columns={c: k for k, c in REVIEW_COLUMNS.items()})
+        df["Date (Parsed)"] = pd.to_datetime(df["Date (Parsed)"], format="%Y-%m-%d", errors="coerce")
+        return df
+
+
+@st.cache_resource
+def get_review_store():
+    return ReviewStore()
+
+
+# ---------- fungsi scraping yang memanfaatkan cookies ----------
+SORT_OPTIONS = {
+    "lowest": ("Lowest rating", "Peringkat terendah"),
+    "newest": ("Newest", "Terbaru"),
+}
+
+# ---------- kesiapan halaman berbasis kondisi (pengganti sleep tetap) ----------
+# timeout per langkah navigasi dalam detik, bisa di-override lewat GMAPS_NAV_TIMEOUTS (json)
+NAV_TIMEOUTS = {
+    "place_header": 15,
+    "reviews_tab": 10,
+    "reviews_panel": 10,
+    "sort_menu": 5,
+    "sort_applied": 5,
+    "first_review": 10,
+}
+NAV_TIMEOUTS.update(json.loads(os.environ.get("GMAPS_NAV_TIMEOUTS", "{}")))
+NAV_POLL_SECONDS = 0.1
+
+PLACE_HEADER = (By.CSS_SELECTOR, "h1.DUwDvf")
+REVIEWS_TAB = (By.XPATH, "//button[contains(., 'Reviews') or contains(., 'Ulasan')]")
+SORT_BUTTON = (By.XPATH, "//button[contains(., 'Sort') or contains(., 'Urutkan')]")
+FIRST_REVIEW = (By.CSS_SELECTOR, ".jftiEf")
+
+
+def sort_option_locator(sort):
+    label_en, label_id = SORT_OPTIONS[sort]
+    return (By.XPATH, f"//*[contains(text(), '{label_en}') or contains(text(), '{label_id}')]")
+
+
+def wait_until(driver, step, condition):
+    """
+    tunggu kondisi kesiapan satu langkah navigasi dengan timeout NAV_TIMEOUTS[step]
+    waktu tunggu dicatat sebagai fase wait_<step>; timeout dicatat di run dan return None
+    """
+    metrics = get_scrape_metrics()
+    with metrics.phase(f"wait_{step}"):
+        try:
+            return WebDriverWait(driver, NAV_TIMEOUTS[step], poll_frequency=NAV_POLL_SECONDS).until(condition)
+        except TimeoutException:
+            print(f"⚠️ Timeout {NAV_TIMEOUTS[step]}s menunggu {step}")
+            metrics.record_timeout(step)
+            return None
+
+
+def stream_low_rating_reviews(gmaps_link, max_scrolls=10000, batch_size=50, prune=True,
+                              pool=None, deadline=None, sort="lowest", covered_at=None, on_blocks=None,
+                              skip_keys=None, stop_event=None, on_phase=None,
+                              ratings=DEFAULT_RATINGS, on_count=None, on_warning=None, on_finish=None):
+    """
+    generator streaming: yield (place_name, rows) per batch selama scroll berjalan
+    dengan prune=True node review yang sudah diproses dihapus dari container
+    sehingga memori chrome dan python tetap datar untuk tempat dengan 10k+ review
+    covered_at: (incremental) berhenti di review pertama yang diposting sebelum waktu ini
+    on_blocks(keys, ratings): dipanggil dengan kunci dan rating semua review yang dipanen (semua rating)
+    skip_keys: review yang sudah tertangkap job sebelumnya, dilewati tanpa diproses ulang (resume)
+    stop_event: threading.Event untuk membatalkan scrape dari thread lain
+    on_phase(name): dipanggil di tiap tahap navigasi untuk laporan progress
+    ratings: rating yang disimpan; dengan sort="lowest" scroll berhenti di review pertama di atas max(ratings)
+    on_count(matched, expected): progress review dengan rating terpilih vs jumlah di histogram (None jika tak terbaca)
+    jumlah di histogram menentukan budget scroll dan titik berhenti, deteksi stall hanya jaring pengaman
+    on_warning(pesan): tujuan peringatan untuk user; default st.warning (hanya berfungsi di thread script)
+    on_finish(complete): dipanggil di akhir; False kalau review terpilih menurut histogram belum semua terpanen
+    (budget habis, stall, deadline, urutan gagal diterapkan) sehingga run bisa dilanjutkan
+    """
+    warn = on_warning or st.warning
+    pool = pool or get_driver_pool()
+    place_key = place_key_for(gmaps_link)
+    # satu acuan waktu untuk seluruh scrape
+    date_parser = RelativeDateParser()
+    # sesi dari pool sudah berisi cookies (disuntikkan sebelum navigasi pertama)
+    with pool.session() as driver, get_scrape_metrics().phases(on_phase) as phase:
+        # lalu buka maps
+        phase("navigate", "opening place")
+        driver.get(gmaps_link)
+
+        # --- Auto-detect place name ---
+        header = wait_until(driver, "place_header", EC.presence_of_element_located(PLACE_HEADER))
+        place_name = (header.text.strip() if header else "") or "Unknown_Place"
+
+        # cek login sekali di halaman maps yang sudah termuat
+        if load_cookies() and check_logged_in_via_driver(driver) is False:
+            warn("cookies ditemukan tapi sepertinya tidak valid atau sudah kadaluarsa silakan login ulang")
+
+        # --- Click Reviews tab ---
+        phase("reviews_tab", "opening reviews")
+        review_tab = wait_until(driver, "reviews_tab", EC.element_to_be_clickable(REVIEWS_TAB))
+        if review_tab:
+            try:
+                driver.execute_script("arguments[0].click();", review_tab)
+            except WebDriverException:
+                pass
+        # panel review siap begitu tombol sort muncul
+        sort_button = wait_until(driver, "reviews_panel", EC.element_to_be_clickable(SORT_BUTTON))
+
+        # histogram bintang ikut diambil dari sesi yang sama untuk panel distribusi
+        phase("distribution")
+        distribusi = read_rating_distribution(driver)
+        if distribusi:
+            remember_rating_distribution(gmaps_link, driver.current_url, distribusi)
+        expected, need = review_targets(distribusi, ratings, sort)
+        if covered_at is not None:
+            # incremental: yang dicari hanya review baru, jumlahnya tidak diketahui
+            expected = None
+        max_scrolls = scroll_budget(need, max_scrolls)
+        matched = 0
+        if on_count:
+            on_count(matched, expected)
+
+        # --- Sort (default: lowest rating, incremental: newest) ---
+        phase("sort", "sorting")
+        # sort dianggap berlaku hanya jika opsi benar-benar diklik dan daftar lama sudah diganti
+        sort_applied = False
+        if sort_button:
+            try:
+                previous = driver.find_elements(*FIRST_REVIEW)[:1]
+                driver.execute_script("arguments[0].click();", sort_button)
+                options = wait_until(driver, "sort_menu", EC.visibility_of_any_elements_located(sort_option_locator(sort)))
+                for opt in options or []:
+                    try:
+                        driver.execute_script("arguments[0].click();", opt)
+                        sort_applied = True
+                        break
+                    except WebDriverException:
+                        continue
+                if sort_applied and previous:
+                    # daftar lama dibuang dulu sebelum daftar dengan urutan baru dimuat
+                    sort_applied = bool(wait_until(driver, "sort_applied", EC.staleness_of(previous[0])))
+            except WebDriverException:
+                sort_applied = False
+        if not sort_applied:
+            warn(f"urutan '{sort}' tidak bisa diterapkan, review dipanen tanpa titik berhenti dan run ditandai partial")
+        wait_until(driver, "first_review", EC.presence_of_element_located(FIRST_REVIEW))
+
+        # --- Scroll & harvest bertahap ---
+        try:
+            scrollable_div = driver.find_element(By.XPATH, "//div[contains(@class,'m6QErb') and contains(@class,'DxyBCb')]")
+        except Exception:
+            scrollable_div = None
+
+        phase("scroll", "scrolling")
+        complete = False
+        if scrollable_div:
+            if expected == 0:
+                # histogram bilang tidak ada review dengan rating terpilih: tidak perlu scroll
+                batches = []
+            else:
+                batches = iter_review_batches(driver, scrollable_div, max_scrolls=max_scrolls,
+                                              batch_size=batch_size, prune=prune, deadline=deadline,
+                                              stop_event=stop_event, target=need)
+            # batas rating dan batas tanggal hanya berarti kalau daftar benar-benar terurut
+            ceiling = ratings if sort == "lowest" and sort_applied else None
+            known = None
+            if covered_at is not None and sort_applied:
+                # tanggal relatif dibulatkan ke hari; margin menutup pembulatan unit minggu/bulan google
+                boundary = (pd.Timestamp(covered_at) - INCREMENTAL_DATE_MARGIN).normalize()
+
+                def is_before_boundary(item):
+                    return date_parser.parse(item.get("date") or "") < boundary
+
+                known = is_before_boundary
+            for blocks in batches:
+                keys = [review_key(place_key, item) for item in blocks]
+                # sampai di review yang sudah tercakup atau di atas batas rating: sisanya tidak perlu dipanen
+                blocks, keys, stop = truncate_batch(blocks, keys, known, ceiling)
+                matched += sum(parse_rating_label(item.get("rating") or "") in ratings for item in blocks)
+                if on_count:
+                    on_count(matched, expected)
+                if expected is not None and matched >= expected:
+                    # semua review dengan rating terpilih menurut histogram sudah terpanen
+                    stop = True
+                if skip_keys:
+                    fresh = [i for i, k in enumerate(keys) if k not in skip_keys]
+                    blocks, keys = [blocks[i] for i in fresh], [keys[i] for i in fresh]
+                rows = build_review_rows(blocks, place_name, place_key, date_parser, ratings)
+                if rows:
+                    yield place_name, rows
+                if on_blocks:
+                    on_blocks(keys, [parse_rating_label(item.get("rating") or "") or None for item in blocks])
+                if stop:
+                    complete = True
+                    break
+        else:
+            # fallback scroll page
+            for _ in range(2):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                metered_sleep(1)
+            yield place_name, build_review_rows(extract_review_blocks(driver), place_name, place_key, date_parser, ratings)
+
+        if on_finish:
+            # tanpa sort hanya jumlah histogram yang bisa membuktikan semua review terpilih sudah terpanen
+            on_finish((sort_applied and (complete or expected is None))
+                      or (expected is not None and matched >= expected))
 
 
-def is_cookie_file_present():
-    return os.path.exists(COOKIES_FILE)
+def scrape_job_id(gmaps_link, sort="lowest", ratings=DEFAULT_RATINGS):
+    # id job stabil per tempat, urutan dan set rating, sehingga run ulang otomatis melanjutkan job yang terputus
+    stars = "".join(str(int(r)) for r in sorted(ratings))
+    return f"{sort}-{stars}-{hashlib.sha1(place_key_for(gmaps_link).encode('utf-8')).hexdigest()[:12]}"
 
-# ---------- fungsi untuk memulai browser agar user login manual ----------
-def start_manual_google_login(timeout=300):
+
+def scrape_into_store(gmaps_link, incremental=False, store=None, job_id=None, on_progress=None, **kwargs):
     """
-    buka browser chrome non headless ke halaman login google
-    user harus menyelesaikan login manual termasuk 2fa atau captcha
-    ketika url berubah keluar dari accounts.google.com atau jika avatar muncul
-    maka cookies disimpan
+    scrape lalu simpan ke ReviewStore per batch
+    incremental=True mengurutkan "Newest" dan berhenti di review yang lebih tua dari job selesai terakhir
+    yang mencakup semua rating yang diminta; kalau belum ada job seperti itu, scrape penuh dijalankan
+    tiap batch adalah checkpoint: review di-flush ke sqlite dan job mencatat jumlah serta kunci terakhir
+    job yang terputus (crash, timeout, dibatalkan) dilanjutkan dengan melewati review yang sudah tertangkap
+    on_progress(harvested, new): dipanggil per checkpoint dengan jumlah kumulatif
+    waktu per fase dan jumlah perintah webdriver dicatat lewat ScrapeMetrics (json + prometheus)
+    return (df semua review tempat ini dari store, place_name, jumlah review baru)
     """
-    options = Options()
-    # jangan headless karena user harus berinteraksi
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    store = store or get_review_store()
+    place_key = place_key_for(gmaps_link)
+    ratings = tuple(sorted(kwargs.get("ratings", DEFAULT_RATINGS)))
+    covered_at = store.covered_since(place_key, ratings) if incremental else None
+    if covered_at is not None:
+        kwargs.update(sort="newest", covered_at=covered_at)
+    else:
+        # set rating lebih luas dari yang pernah selesai di-scrape: incremental tidak bisa mengisi yang lama
+        incremental = False
+    sort = kwargs.get("sort", "lowest")
+    job_id = job_id or scrape_job_id(gmaps_link, sort, ratings)
+    if store.start_job(job_id, place_key, sort, ratings) and not incremental:
+        # posisi scroll maps tidak bisa dipulihkan; scroll ulang tapi review yang sudah tertangkap dilewati
+        kwargs["skip_keys"] = store.captured_keys(place_key, ratings)
+
+    place_name = "Unknown_Place"
+    new_count = 0
+    harvested = 0
+
+    metrics = get_scrape_metrics()
+    caller_on_count = kwargs.pop("on_count", None)
+
+    def on_count(matched, expected):
+        # target dari histogram ikut tercatat di log run
+        run["matched"], run["expected"] = matched, expected
+        if caller_on_count:
+            caller_on_count(matched, expected)
+
+    def checkpoint(keys, key_ratings):
+        nonlocal harvested
+        with metrics.phase("store"):
+            store.mark_seen(place_key, keys, key_ratings)
+            store.checkpoint_job(job_id, len(keys), keys[-1] if keys else None)
+        harvested += len(keys)
+        run["reviews"], run["new"] = harvested, new_count
+        if on_progress:
+            on_progress(harvested, new_count)
+
+    complete = False
+
+    def on_finish(finished):
+        nonlocal complete
+        complete = finished
 
     try:
-        driver.get("https://accounts.google.com/signin/v2/identifier")
-        st.info("browser terbuka silakan login di jendela yang muncul selesaikan semua 2fa atau captcha jika muncul")
-        wait = WebDriverWait(driver, 5)
-        start = time.time()
-        while True:
-            current_url = driver.current_url
-            # jika url tidak lagi berada di accounts.google.com besar kemungkinan sudah login
-            if "accounts.google.com" not in current_url:
-                # simpan cookies
-                cookies = driver.get_cookies()
-                save_cookies(cookies)
-                driver.quit()
-                return True
-            # cek juga indikator avatar presence
-            try:
-                avatar = driver.find_elements(By.XPATH, "//img[contains(@alt,'Google Account') or contains(@alt,'Foto profil')]")
-                if avatar:
-                    cookies = driver.get_cookies()
-                    save_cookies(cookies)
-                    driver.quit()
-                    return True
-            except Exception:
-                pass
-
-            if time.time() - start > timeout:
-                # timeout menunggu login manual
-                driver.quit()
-                return False
-            time.sleep(1)
-    except Exception as e:
-        try:
-            driver.quit()
-        except:
-            pass
-        st.error(f"gagal membuka browser untuk login {e}")
-        return False
+        with metrics.run(gmaps_link) as run:
+            stream = stream_low_rating_reviews(
+                gmaps_link, on_blocks=checkpoint, on_count=on_count, on_finish=on_finish, **kwargs
+            )
+            for place_name, rows in stream:
+                with metrics.phase("store"):
+                    new_count += store.upsert(place_key, rows)
+            run["new"] = new_count
+    except BaseException:
+        store.finish_job(job_id, "failed")
+        raise
+    deadline = kwargs.get("deadline")
+    stop_event = kwargs.get("stop_event")
+    if stop_event is not None and stop_event.is_set():
+        store.finish_job(job_id, "cancelled")
+    elif not complete or (deadline is not None and time.monotonic() >= deadline):
+        # histogram belum terpenuhi (budget habis / stall) atau waktu habis: bisa dilanjutkan
+        store.finish_job(job_id, "partial")
+    else:
+        store.finish_job(job_id, "done")
+    return store.load_place(place_key), place_name, new_count
 
 
-# ---------- semantic model setup ----------
-@st.cache_resource
-def load_semantic_model():
-    model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
-    category_embeddings = model.encode(report_categories, convert_to_tensor=True)
-    return model, category_embeddings
+# ---------- batch scraping banyak tempat ----------
+BATCH_MAX_BROWSERS = int(os.environ.get("GMAPS_BATCH_MAX_BROWSERS", str(max(1, (os.cpu_count() or 2) // 2))))
+BATCH_PLACE_TIMEOUT = int(os.environ.get("GMAPS_BATCH_PLACE_TIMEOUT", "900"))  # detik
 
-model, category_embeddings = load_semantic_model()
 
-# ---------- helper untuk memuat cookies ke driver baru ----------
-def apply_cookies_to_driver(driver, cookies):
+def read_place_links(text="", uploaded_file=None):
     """
-    driver harus sudah mengunjungi domain utama google dulu
-    kemudian kita tambahkan cookies satu per satu
+    kumpulkan link maps dari textarea dan/atau file txt/csv (satu link per baris)
+    baris kosong, komentar (#) dan duplikat dilewati
     """
-    driver.get("https://www.google.com")
-    # hapus cookies default agar terpakai cookies kita
-    driver.delete_all_cookies()
-    for c in cookies:
-        # selenium add_cookie mengharapkan dict dengan nama domain path value
-        # some keys like sameSite may cause issues jadi kita filter
-        cookie = {}
-        for k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry"):
-            if k in c:
-                cookie[k] = c[k]
-        try:
-            driver.add_cookie(cookie)
-        except Exception:
-            # jika gagal tambahkan expiry atau properti lain mungkin problem
-            try:
-                # coba tanpa expiry
-                cookie2 = {k: cookie[k] for k in cookie if k != "expiry"}
-                driver.add_cookie(cookie2)
-            except Exception:
-                pass
-    driver.refresh()
-    time.sleep(2)
+    lines = (text or "").splitlines()
+    if uploaded_file is not None:
+        lines += uploaded_file.getvalue().decode("utf-8", errors="ignore").splitlines()
+    links = []
+    for line in lines:
+        # csv: ambil kolom pertama yang berupa url
+        for cell in line.split(","):
+            cell = cell.strip().strip('"')
+            if cell.startswith("http") and cell not in links:
+                links.append(cell)
+                break
+    return links
+
+
+def _scrape_place(link, pool, store, place_timeout, incremental, **kwargs):
+    start = time.monotonic()
+    df_place = pd.DataFrame()
+    place_name = "Unknown_Place"
+    new_count = 0
+    status = "ok"
+    stop_event = kwargs.get("stop_event")
+    if stop_event is not None and stop_event.is_set():
+        # batch dibatalkan: tempat yang belum mulai tidak dibuka sama sekali
+        return link, place_name, df_place, new_count, "cancelled", 0.0
+    try:
+        df_place, place_name, new_count = scrape_into_store(
+            link, incremental=incremental, store=store, pool=pool, deadline=start + place_timeout, **kwargs
+        )
+        if time.monotonic() - start >= place_timeout:
+            status = "timeout (partial)"
+    except Exception as e:
+        status = f"error: {e}"
+    return link, place_name, df_place, new_count, status, time.monotonic() - start
+
 
-def check_logged_in_via_driver(driver, timeout=10):
+def scrape_places(links, max_browsers=BATCH_MAX_BROWSERS, place_timeout=BATCH_PLACE_TIMEOUT,
+                  incremental=False, on_place_done=None, store=None, **kwargs):
     """
-    coba deteksi apakah sudah login dengan melihat avatar atau tombol sign out
+    scrape banyak tempat sekaligus, maksimal max_browsers chrome headless berjalan paralel
+    tiap chrome adalah proses sendiri; thread python di sini hanya mengirim perintah webdriver
+    kwargs (stop_event, on_warning, ...) diteruskan ke scrape_into_store tiap tempat
+    return (df gabungan dengan kolom "Place Key", df timing per tempat)
     """
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            # avatar indicator on google main
-            avatars = driver.find_elements(By.XPATH, "//img[contains(@alt,'Google Account') or contains(@aria-label,'Profile') or contains(@alt,'Foto profil')]")
-            if avatars:
-                return True
-            # atau tombol sign out di accounts
-            signout = driver.find_elements(By.XPATH, "//*[contains(text(),'Sign out') or contains(text(),'Keluar')]")
-            if signout:
-                return True
-        except Exception:
-            pass
-        time.sleep(1)
-    return False
+    pool = DriverPool(size=max_browsers)
+    store = store or get_review_store()
+    frames, timings = [], []
+    try:
+        with ThreadPoolExecutor(max_workers=max_browsers) as executor:
+            futures = [
+                executor.submit(_scrape_place, link, pool, store, place_timeout, incremental, **kwargs)
+                for link in links
+            ]
+            for future in as_completed(futures):
+                link, place_name, df_place, new_count, status, seconds = future.result()
+                if not df_place.empty:
+                    frames.append(df_place)
+                timings.append({
+                    "Place Key": link,
+                    "Place": place_name,
+                    "Reviews": len(df_place),
+                    "New": new_count,
+                    "Seconds": round(seconds, 1),
+                    "Status": status,
+                })
+                if on_place_done:
+                    on_place_done(len(timings), len(links), timings[-1])
+    finally:
+        pool.close()
 
-def classify_report_category(review_text):
-    if not review_text or len(review_text.strip()) < 3:
-        return "Other", 0.0
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return df, pd.DataFrame(timings)
 
-    text_embedding = model.encode(review_text, convert_to_tensor=True)
-    cosine_scores = util.cos_sim(text_embedding, category_embeddings)
-    best_idx = cosine_scores.argmax().item()
-    best_score = cosine_scores[0][best_idx].item()
 
-    return report_categories[best_idx], round(best_score * 100, 2)
+# ---------- job scraping di background ----------
+class ScrapeJob:
+    """
+    state satu job scraping di background; dibaca thread ui, ditulis thread worker
+    """
 
+    def __init__(self, job_id, gmaps_link):
+        self.job_id = job_id
+        self.gmaps_link = gmaps_link
+        self.status = "queued"
+        self.phase = "queued"
+        self.harvested = 0
+        self.new = 0
+        self.matched = 0
+        self.expected = None
+        self.scroll_started = None
+        self.places_done = 0
+        self.places_total = None
+        self.warnings = []
+        self.error = None
+        self.result = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+
+    def update_count(self, matched, expected):
+        if self.scroll_started is None:
+            self.scroll_started = time.time()
+        self.matched, self.expected = matched, expected
+
+    def progress(self):
+        """
+        (persen selesai, eta detik) dari review terpilih yang terpanen vs jumlah di histogram
+        eta diekstrapolasi dari laju sejak scroll dimulai; None kalau belum bisa dihitung
+        """
+        if not self.expected:
+            return None, None
+        percent = min(100.0, 100.0 * self.matched / self.expected)
+        if not self.matched or self.scroll_started is None:
+            return percent, None
+        rate = self.matched / max(time.time() - self.scroll_started, 1e-6)
+        return percent, max(self.expected - self.matched, 0) / rate
+
+    def snapshot(self):
+        percent, eta = self.progress()
+        return {
+            "job_id": self.job_id,
+            "link": self.gmaps_link,
+            "status": self.status,
+            "phase": self.phase,
+            "harvested": self.harvested,
+            "new": self.new,
+            "matched": self.matched,
+            "expected": self.expected,
+            "percent": percent,
+            "eta": eta,
+            "places_done": self.places_done,
+            "places_total": self.places_total,
+            "warnings": list(self.warnings),
+            "error": self.error,
+            "elapsed": (self.finished_at or time.time()) - self.started_at,
+        }
 
-def clean_review_text_en(text):
-    if not text:
-        return ""
-    text = emoji.replace_emoji(text, replace="")
-    text = text.lower()
-    text = re.sub(r"http\S+|www\S+|https\S+", "", text)
-    text = re.sub(r"[^a-z0-9\s.,!?']", " ", text)
-    words = text.split()
-    filtered_words = [w for w in words if w not in stop_words]
-    return " ".join(filtered_words).strip()
 
-# ---------- helper parse tanggal relatif ----------
-def parse_relative_date(text):
-    text = (text or "").lower().strip()
-    now = datetime.now()
-    patterns = [
-        (r"(\d+)\s+day", "days"),
-        (r"(\d+)\s+week", "weeks"),
-        (r"(\d+)\s+month", "months"),
-        (r"(\d+)\s+year", "years"),
-    ]
-    for pattern, unit in patterns:
-        match = re.search(pattern, text)
-        if match:
-            num = int(match.group(1))
-            if unit == "days":
-                return (now - timedelta(days=num)).strftime("%Y-%m-%d")
-            elif unit == "weeks":
-                return (now - timedelta(weeks=num)).strftime("%Y-%m-%d")
-            elif unit == "months":
-                return (now - timedelta(days=30 * num)).strftime("%Y-%m-%d")
-            elif unit == "years":
-                return (now - timedelta(days=365 * num)).strftime("%Y-%m-%d")
-    try:
-        return datetime.strptime(text, "%B %Y").strftime("%Y-%m-%d")
-    except Exception:
-        return text
+# job yang sudah selesai tetap disimpan selama ini supaya semua sesi yang memantaunya sempat membaca hasilnya
+JOB_RESULT_TTL_SECONDS = 15 * 60
+# thread job scraping satu tempat: menunggu slot DriverPool, jadi boleh lebih banyak dari jumlah chrome
+JOB_MAX_WORKERS = int(os.environ.get("GMAPS_JOB_MAX_WORKERS", "8"))
+# batch membuka pool chrome sendiri (max_browsers), jadi batch dijalankan satu per satu
+BATCH_JOB_MAX_WORKERS = int(os.environ.get("GMAPS_BATCH_JOB_MAX_WORKERS", "1"))
 
-# ---------- fungsi scraping yang memanfaatkan cookies ----------
-def get_low_rating_reviews(gmaps_link, max_scrolls=10000):
-    options = Options()
-    # jangan headless karena beberapa interaksi membutuhkan javascript penuh
-    # kamu boleh set headless jika yakin
-    options.add_argument("--headless=new")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--log-level=3")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+class ScrapeJobManager:
+    """
+    api kecil untuk scraping di background: submit, status, cancel, result
+    scrape berjalan di thread worker sehingga sesi streamlit tidak membeku,
+    jumlah chrome yang benar-benar jalan tetap dibatasi oleh slot DriverPool
+    batch punya executor sendiri sehingga job satu tempat tidak antre di belakang batch yang berjam-jam
+    job yang selesai dibuang setelah JOB_RESULT_TTL_SECONDS, bukan oleh sesi pertama yang membacanya
+    """
 
-    # jika ada cookies simpanan, apply dulu
-    cookies = load_cookies()
-    if cookies:
+    def __init__(self, max_workers=JOB_MAX_WORKERS, batch_workers=BATCH_JOB_MAX_WORKERS,
+                 result_ttl=JOB_RESULT_TTL_SECONDS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scrape-job")
+        self._batch_executor = ThreadPoolExecutor(max_workers=batch_workers, thread_name_prefix="scrape-batch")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.result_ttl = result_ttl
+
+    def _prune(self):
+        # dipanggil dengan self._lock terkunci
+        cutoff = time.time() - self.result_ttl
+        for job_id in [k for k, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _register(self, job_id, gmaps_link):
+        """
+        return (job, baru); job dengan id sama yang masih berjalan dipakai ulang
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job and job.status in ("queued", "running"):
+                return job, False
+            job = self._jobs[job_id] = ScrapeJob(job_id, gmaps_link)
+            return job, True
+
+    def _execute(self, job, work):
+        job.status = "running"
         try:
-            apply_cookies_to_driver(driver, cookies)
-            time.sleep(2)
-            driver.get("https://www.google.com/maps")
-            # cek login
-            if not check_logged_in_via_driver(driver, timeout=3):
-                st.warning("cookies ditemukan tapi sepertinya tidak valid atau sudah kadaluarsa silakan login ulang")
+            job.result = work(job)
+            job.status = "cancelled" if job.cancel_event.is_set() else "done"
         except Exception as e:
-            st.warning(f"gagal apply cookies {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.phase = job.status
+            job.finished_at = time.time()
+
+    def submit(self, gmaps_link, incremental=False, pool=None, store=None, **kwargs):
+        sort = "newest" if incremental else kwargs.get("sort", "lowest")
+        job, new = self._register(scrape_job_id(gmaps_link, sort, kwargs.get("ratings", DEFAULT_RATINGS)), gmaps_link)
+        if not new:
+            # tempat yang sama sedang di-scrape, pakai job yang sudah berjalan
+            return job.job_id
+        # pool dan store di-resolve di thread script; peringatan dari worker dikumpulkan di job
+        pool = pool or get_driver_pool()
+        store = store or get_review_store()
+
+        def work(job):
+            def on_progress(harvested, new_count):
+                job.harvested, job.new = harvested, new_count
+
+            def on_phase(name):
+                job.phase = name
+
+            result = scrape_into_store(
+                job.gmaps_link, incremental=incremental, store=store, pool=pool,
+                stop_event=job.cancel_event, on_phase=on_phase, on_progress=on_progress,
+                on_count=job.update_count, on_warning=job.warnings.append, **kwargs
+            )
+            job.new = result[2]
+            return result
 
-    # lalu buka maps
-    driver.get(gmaps_link)
-    time.sleep(5)
+        self._executor.submit(self._execute, job, work)
+        return job.job_id
 
-    # --- Auto-detect place name ---
-    try:
-        place_name = driver.find_element(By.XPATH, "//h1[contains(@class, 'DUwDvf')]").text.strip()
-    except Exception:
-        place_name = "Unknown_Place"
+    def submit_batch(self, links, max_browsers=BATCH_MAX_BROWSERS, place_timeout=BATCH_PLACE_TIMEOUT,
+                     incremental=False, store=None):
+        """
+        batch scraping sebagai satu job; result berupa (df gabungan, df timing per tempat)
+        """
+        digest = hashlib.sha1("\n".join(links).encode("utf-8")).hexdigest()[:12]
+        job, new = self._register(f"batch-{digest}", f"{len(links)} places")
+        if not new:
+            return job.job_id
+        job.places_total = len(links)
+        store = store or get_review_store()
+
+        def work(job):
+            def on_place_done(done, total, timing):
+                job.places_done = done
+                job.phase = f"{done}/{total} places — last: {timing['Place']}"
+
+            return scrape_places(
+                links, max_browsers=max_browsers, place_timeout=place_timeout, incremental=incremental,
+                on_place_done=on_place_done, store=store, stop_event=job.cancel_event,
+                on_warning=job.warnings.append,
+            )
 
-    # --- Click Reviews tab ---
-    try:
-        review_tab = driver.find_element(By.XPATH, "//button[contains(., 'Reviews') or contains(., 'Ulasan')]")
-        driver.execute_script("arguments[0].click();", review_tab)
-        time.sleep(2)
-    except Exception:
-        pass
+        self._batch_executor.submit(self._execute, job, work)
+        return job.job_id
 
-    # --- Sort by lowest rating ---
-    try:
-        sort_button = driver.find_element(By.XPATH, "//button[contains(., 'Sort') or contains(., 'Urutkan')]")
-        driver.execute_script("arguments[0].click();", sort_button)
-        time.sleep(1)
-        lowest = driver.find_elements(By.XPATH, "//*[contains(text(), 'Lowest rating') or contains(text(), 'Peringkat terendah')]")
-        for opt in lowest:
-            try:
-                driver.execute_script("arguments[0].click();", opt)
-                break
-            except Exception:
-                continue
-        time.sleep(2)
-    except Exception:
-        pass
+    def status(self, job_id):
+        # None berarti job tidak dikenal lagi (kadaluarsa atau server restart)
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
 
-    # --- Scroll efficiently ---
-    try:
-        scrollable_div = driver.find_element(By.XPATH, "//div[contains(@class,'m6QErb') and contains(@class,'DxyBCb')]")
-    except Exception:
-        scrollable_div = None
-
-    if scrollable_div:
-        last_height = 0
-        same_count = 0
-        for i in range(max_scrolls):
-            driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight", scrollable_div)
-            time.sleep(0.5)
-            new_height = driver.execute_script("return arguments[0].scrollTop", scrollable_div)
-            if new_height == last_height:
-                same_count += 1
-                if same_count >= 2:
-                    break
-            else:
-                same_count = 0
-            last_height = new_height
-    else:
-        # fallback scroll page
-        for _ in range(2):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job:
+            job.cancel_event.set()
+            job.phase = "cancelling"
 
-    # --- Extract all reviews ---
-    blocks = driver.find_elements(By.CLASS_NAME, "jftiEf")
-    data = []
+    def result(self, job_id):
+        # (df, place_name, new_count) setelah job selesai atau dibatalkan, None kalau belum
+        job = self._jobs.get(job_id)
+        return job.result if job else None
+
+    def jobs(self):
+        with self._lock:
+            return [job.snapshot() for job in self._jobs.values()]
+
+
+@st.cache_resource
+def get_job_manager():
+    return ScrapeJobManager()
 
-    for rb in blocks:
-        try:
-            rating_text = rb.find_element(By.CLASS_NAME, "kvMYJc").get_attribute("aria-label")
-            rating = rating_text.split()[0] if rating_text else ""
-        except Exception:
-            rating = ""
-        try:
-            more_button = rb.find_element(By.CLASS_NAME, "w8nwRe")
-            driver.execute_script("arguments[0].click();", more_button)
-            time.sleep(0.2)
-        except Exception:
-            pass
-        try:
-            text = rb.find_element(By.CLASS_NAME, "wiI7pd").text.strip()
-        except Exception:
-            text = ""
-        clean_text = clean_review_text_en(text)
-        try:
-            user = rb.find_element(By.CLASS_NAME, "d4r55").text
-        except Exception:
-            user = ""
-        try:
-            date_txt = rb.find_element(By.CLASS_NAME, "rsqaWe").text
-            date_parsed = parse_relative_date(date_txt)
-        except Exception:
-            date_txt = ""
-            date_parsed = ""
-        try:
-            total_reviews = rb.find_element(By.CLASS_NAME, "RfnDt").text
-        except Exception:
-            total_reviews = ""
-        try:
-            rating_value = float(rating)
-        except Exception:
-            rating_value = 0
-        if rating_value in [1.0, 2.0]:
-            data.append({
-                "Place": place_name,
-                "User": user,
-                "Total Reviews": total_reviews,
-                "Rating": rating_value,
-                "Date (Raw)": date_txt,
-                "Date (Parsed)": date_parsed,
-                "Review Text": clean_text
-            })
-
-    driver.quit()
-    df = pd.DataFrame(data)
-    df["Place"] = place_name
-    return df, place_name
 
 def auto_report_review(row, report_type=None):
     options = Options()
     options.add_argument("--start-maximized")
     options.add_argument("--disable-blink-features=AutomationControlled")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    driver = webdriver.Chrome(service=chrome_service(), options=options)
 
     # --- apply cookies ---
     cookies = load_cookies()
     if cookies:
         try:
             apply_cookies_to_driver(driver, cookies)
-            time.sleep(2)
-            driver.get("https://www.google.com/maps")
-            if not check_logged_in_via_driver(driver, timeout=5):
-                st.warning("Invalid cookies — login may need to be repeated")
         except Exception as e:
             st.warning(f"Fail apply cookies: {e}")
 
@@ -414,6 +2341,8 @@ def auto_report_review(row, report_type=None):
             st.warning(f"Gagal membuka link Google Maps: {e}")
 
         time.sleep(5)
+        if cookies and check_logged_in_via_driver(driver) is False:
+            st.warning("Invalid cookies — login may need to be repeated")
 
         # buka tab review
         try:
@@ -709,187 +2638,365 @@ def auto_report_review(row, report_type=None):
 
 
 
-# ---------- streamlit ui ----------
-# st.set_page_config(page_title="Google Maps Review Scraper", layout="wide")
-st.title("📍 Google Maps Review Scraper")
-
-if "google_logged" not in st.session_state:
-    st.session_state.google_logged = is_cookie_file_present()
+# ---------- helper tabel review (grid) ----------
+@st.cache_data(max_entries=4, show_spinner="Classifying reviews...")
+def categorize_reviews(fingerprint, _df):
+    """
+    tambahkan kolom Category/Score untuk seluruh dataframe sekali saja
+    di-cache per hash isi dataframe sehingga paging/filter tidak meng-encode ulang
+    """
+    df = _df.reset_index(drop=True).copy()
+    labels, scores = classify_report_categories(df["Review Text"])
+    df["Category"] = labels
+    df["Score"] = scores
+    return df
 
-st.markdown("## Login Google Account")
-if not st.session_state.google_logged:
-    st.markdown(
-        "Press the button below to open the Chrome browser, then log in to your Google account in the window that appears. After successfully logging in, cookies will be saved."
-    )
-    if st.button("🔑 Open Browser for login"):
-        ok = start_manual_google_login(timeout=300)
-        if ok:
-            st.success("login successful cookies saved")
-            st.session_state.google_logged = True
-        else:
-            st.error("login failed or timeout, please try again")
 
-else:
-    st.success("You are already logged in using stored cookies.n")
+def filter_reviews(df, ratings=None, categories=None, query="", exclude_keys=None):
+    mask = pd.Series(True, index=df.index)
+    if ratings:
+        mask &= df["Rating"].isin(ratings)
+    if categories:
+        mask &= df["Category"].isin(categories)
+    if query:
+        q = query.lower()
+        mask &= (df["User"].str.lower().str.contains(q, regex=False)
+                 | df["Review Text"].str.contains(q, regex=False))
+    if exclude_keys:
+        mask &= [(u, t) not in exclude_keys for u, t in zip(df["User"], df["Review Text"])]
+    return df[mask]
 
-st.divider()
 
-# jika belum login tampilkan instruksi dan hentikan
-if not st.session_state.google_logged:
-    st.info("Please log in before using the scraping feature.")
-    st.stop()
+# ---------- export on-demand (xlsx streaming, parquet, csv gzip) ----------
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_FORMATS = ["Excel (.xlsx)", "Parquet", "CSV (gzip)"]
 
-# setelah login tampilkan fitur scraping yang sama dengan skripmu
-gmaps_link = st.text_input("🔗 Google Maps Link:")
 
-col1, col2 = st.columns([2, 1])
+def dataframe_fingerprint(df):
+    # hash isi dataframe, dipakai sebagai kunci cache export
+    digest = hashlib.sha1("|".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
 
-with col1:
-    if "df_reviews" not in st.session_state:
-        st.session_state.df_reviews = pd.DataFrame()
-        st.session_state.place_name = ""
 
-    if st.button("🚀 Start Scraping"):
-        if gmaps_link:
-            with st.spinner("Fetching low-rating reviews... please wait a few minutes."):
-                try:
-                    df, place_name = get_low_rating_reviews(gmaps_link)
-                except Exception as e:
-                    st.error(f"gagal scraping {e}")
-                    df = pd.DataFrame()
-                    place_name = ""
-            if not df.empty:
-                st.session_state.df_reviews = df
-                st.session_state.place_name = place_name
-                st.success(f"✅ Collected {len(df)} low-rating reviews from **{place_name}**")
-            else:
-                st.warning("No 1★ or 2★ reviews found.")
-        else:
-            st.error("Please input a valid Google Maps link.")
+def _safe_name(name, limit=None):
+    name = re.sub(r"[\\/*?:\[\]]", "_", str(name)).strip() or "Unknown_Place"
+    return name[:limit] if limit else name
 
-    df = st.session_state.df_reviews
 
-    if not df.empty:
-        st.divider()
-        st.subheader(f"📊 Low-Rating Reviews from: {st.session_state.place_name}")
+def _place_label(place, suffix="", limit=None):
+    # suffix kunci tempat tidak ikut terpotong batas panjang nama sheet
+    if not suffix:
+        return _safe_name(place, limit)
+    return f"{_safe_name(place, limit - len(suffix) - 1 if limit else None)}_{suffix}"
 
-        per_page = st.selectbox("Show reviews per page:", [10, 25, 100, "All"])
 
-        if per_page != "All":
-            per_page = int(per_page)
-            total_pages = (len(df) - 1) // per_page + 1
+def _split_places(df):
+    """
+    satu sheet / partisi per tempat untuk export multi-place, return [(nama, suffix kunci, part)]
+    dikelompokkan per Place Key: cabang berbeda dengan nama sama (mis. jaringan toko) tetap terpisah
+    """
+    if df.empty or "Place" not in df:
+        return [("reviews", "", df)]
+    if "Place Key" not in df:
+        if df["Place"].nunique() <= 1:
+            return [(df["Place"].iloc[0], "", df)]
+        return [(place, "", part) for place, part in df.groupby("Place", sort=False)]
+    groups = df.groupby(df["Place Key"].fillna(df["Place"]), sort=False)
+    if groups.ngroups <= 1:
+        return [(df["Place"].iloc[0], "", df)]
+    return [
+        (part["Place"].iloc[0], hashlib.sha1(str(key).encode("utf-8")).hexdigest()[:6], part)
+        for key, part in groups
+    ]
 
-            # Inisialisasi session state untuk pagination
-            if "current_page" not in st.session_state:
-                st.session_state.current_page = 1
 
-            # Fungsi pindah halaman
-            def set_page(p):
-                st.session_state.current_page = p
+def _write_xlsx_streaming(df):
+    """
+    openpyxl mode write-only: baris ditulis langsung tanpa menyimpan seluruh workbook di memori
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    used = set()
+    for place, suffix, part in _split_places(df):
+        title = _place_label(place, suffix, 31)
+        while title in used:
+            title = f"{title[:28]}_{len(used)}"
+        used.add(title)
+        ws = wb.create_sheet(title=title)
+        ws.append(list(part.columns))
+        for row in part.astype(object).where(part.notna(), None).itertuples(index=False, name=None):
+            ws.append(list(row))
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def _zip_parts(parts):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, data in parts:
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def build_export(fingerprint, fmt, _df):
+    """
+    export dibuat hanya saat diminta dan di-cache per (hash isi dataframe, format)
+    multi-place: xlsx satu sheet per tempat, parquet/csv satu file per tempat dalam zip
+    return (bytes, ekstensi, mime)
+    """
+    if fmt == "Excel (.xlsx)":
+        return _write_xlsx_streaming(_df), "xlsx", XLSX_MIME
+
+    places = _split_places(_df)
+    if fmt == "Parquet":
+        def encode(part):
+            buffer = io.BytesIO()
+            part.to_parquet(buffer, index=False, compression="zstd")
+            return buffer.getvalue()
+        ext, mime = "parquet", "application/vnd.apache.parquet"
+    else:
+        def encode(part):
+            return gzip.compress(part.to_csv(index=False).encode("utf-8"), compresslevel=6)
+        ext, mime = "csv.gz", "application/gzip"
 
-            # Hitung index awal dan akhir
-            page = st.session_state.current_page
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            df_show = df.iloc[start_idx:end_idx]
-            st.write(f"Showing {start_idx+1}–{min(end_idx, len(df))} of {len(df)} reviews.")
+    if len(places) == 1:
+        return encode(places[0][2]), ext, mime
+    parts = [(f"place={_place_label(place, suffix)}/reviews.{ext}", encode(part)) for place, suffix, part in places]
+    return _zip_parts(parts), "zip", "application/zip"
 
-            # Tampilkan tombol pagination
-            st.write("### 📄 Page")
-            page_cols = st.columns(min(total_pages, 10))  # Maks 10 tombol per baris
 
-            for i in range(total_pages):
-                col = page_cols[i % 10]  # ulang tiap 10 kolom
-                with col:
-                    page_num = i + 1
-                    if st.button(str(page_num), key=f"page_btn_{page_num}"):
-                        set_page(page_num)
+# ---------- fragment ui (rerun terisolasi) ----------
+@st.fragment
+def render_review_list():
+    """
+    tabel review, pagination dan export sebagai fragment
+    klik di dalam tabel hanya menjalankan ulang fungsi ini, bukan seluruh app.py
+    """
+    df = st.session_state.df_reviews
 
-        else:
-            df_show = df
-            st.write(f"Showing all {len(df)} reviews.")
+    if not df.empty:
+        st.divider()
+        st.subheader(f"📊 Low-Rating Reviews from: {st.session_state.place_name}")
 
+        if "reported" not in st.session_state:
+            st.session_state["reported"] = []
+        reported_keys = {(r["User"], r["Review Text"]) for r in st.session_state["reported"]}
+
+        # kategori dihitung sekali per dataframe (batch + cache), bukan per baris per rerun
+        df_all = categorize_reviews(dataframe_fingerprint(df), df)
+
+        # --- filter di sisi server ---
+        fc1, fc2, fc3 = st.columns([1, 2, 2])
+        rating_filter = fc1.multiselect("Rating", sorted(df_all["Rating"].unique()), key="filter_rating")
+        category_filter = fc2.multiselect("Category", report_categories + ["Other"], key="filter_category")
+        text_filter = fc3.text_input("Search user / text", key="filter_text")
+        hide_reported = st.checkbox("Hide already reported", key="filter_hide_reported")
+        df_filtered = filter_reviews(
+            df_all, rating_filter, category_filter, text_filter,
+            reported_keys if hide_reported else None,
+        )
 
-        st.markdown("### 💬 Review Table (click 🚨 to mark)")
+        # --- pagination server-side: hanya halaman aktif yang dirender ---
+        pc1, pc2 = st.columns(2)
+        per_page = pc1.selectbox("Show reviews per page:", [10, 25, 100, 500, "All"], key="per_page")
+        per_page = (len(df_filtered) or 1) if per_page == "All" else int(per_page)
+        total_pages = max(1, (len(df_filtered) - 1) // per_page + 1)
+        # filter bisa mengurangi jumlah halaman, jaga agar halaman aktif tetap valid
+        if st.session_state.get("current_page", 1) > total_pages:
+            st.session_state.current_page = total_pages
+        page = pc2.number_input(f"📄 Page (1–{total_pages})", 1, total_pages, key="current_page")
+        start_idx = (page - 1) * per_page
+        df_show = df_filtered.iloc[start_idx:start_idx + per_page]
+        st.write(f"Showing {min(start_idx + 1, len(df_filtered))}–{start_idx + len(df_show)} "
+                 f"of {len(df_filtered)} reviews ({len(df)} total).")
+
+        st.markdown("### 💬 Review Table (tick 🚨 to mark)")
+        grid = df_show[["User", "Rating", "Date (Parsed)", "Total Reviews", "Review Text", "Category", "Score"]].copy()
+        grid.insert(0, "Reported", [(u, t) in reported_keys for u, t in zip(df_show["User"], df_show["Review Text"])])
+        grid.insert(0, "Report", False)
+        grid["Report Type"] = [c if c in report_categories else report_categories[-1] for c in grid["Category"]]
+        edited = st.data_editor(
+            grid,
+            key=f"grid_{page}_{per_page}",
+            hide_index=True,
+            use_container_width=True,
+            disabled=[c for c in grid.columns if c not in ("Report", "Report Type")],
+            column_config={
+                "Report": st.column_config.CheckboxColumn("🚨", help="Mark for automatic report"),
+                "Reported": st.column_config.CheckboxColumn("✅"),
+                "Review Text": st.column_config.TextColumn(width="large"),
+                "Score": st.column_config.ProgressColumn("Match %", min_value=0, max_value=100, format="%.1f"),
+                "Report Type": st.column_config.SelectboxColumn(options=report_categories, required=True),
+            },
+        )
 
-        if st.button("🚨 REPORT ALL (Auto AI Prediction)", key="report_all"):
-            if not df_show.empty:
-                reported_count = 0
-                for idx, row in df_show.iterrows():
-                    category, score = classify_report_category(row["Review Text"])
-                    auto_report_review(row, category)  # Langsung report berdasarkan prediksi otomatis
+        def report_rows(selection):
+            reported_count = 0
+            for idx, choice in selection:
+                row = df_show.loc[idx]
+                try:
+                    auto_report_review(row, choice)
+                    st.session_state["reported"].append({
+                        "User": row["User"],
+                        "Review Text": row["Review Text"],
+                        "Date": row["Date (Parsed)"],
+                        "Kategori Report": choice
+                    })
                     reported_count += 1
-                st.success(f"✅ Berhasil mereport otomatis {reported_count} review berdasarkan prediksi AI!")
+                except Exception as e:
+                    st.error(f"Failed Report: {e}")
+            return reported_count
+
+        ac1, ac2 = st.columns(2)
+        if ac1.button("🚨 Report selected", key="report_selected"):
+            marked = edited[edited["Report"] & ~edited["Reported"]]
+            if marked.empty:
+                st.warning("Tidak ada review yang ditandai.")
+            else:
+                count = report_rows(zip(marked.index, marked["Report Type"]))
+                st.success(f"✅ {count} review successfully reported and added to the list below!")
+
+        if ac2.button("🚨 REPORT ALL (Auto AI Prediction)", key="report_all"):
+            pending = edited[~edited["Reported"]]
+            if not pending.empty:
+                count = report_rows(zip(pending.index, pending["Report Type"]))
+                st.success(f"✅ Berhasil mereport otomatis {count} review berdasarkan prediksi AI!")
             else:
                 st.warning("Tidak ada review untuk direport.")
 
-
-        df_show = df_show.copy()
-        # --- tampilkan tiap review ---
-        for idx, row in df_show.iterrows():
-            with st.container():
-                st.markdown(f"**👤 {row['User']}** — ⭐ {row['Rating']}")
-                st.markdown(f"🕒 {row['Date (Parsed)']}  |  {row['Total Reviews']}")
-                st.markdown(f"💬 {row['Review Text'] or '_(tidak ada teks)_'}")
-
-                category, score = classify_report_category(row["Review Text"])
-                st.markdown(f"**🔖 Prediksi Kategori:** `{category}` ({score}% match)")
-
-                report_choice = st.selectbox(
-                    f"📑 Select the type of report for {row['User']}",
-                    report_categories,
-                    index=report_categories.index(category) if category in report_categories else len(report_categories) - 1,
-                    key=f"choice_{idx}"
-                )
-
-                # cek apakah review ini sudah pernah direport
-                if "reported" not in st.session_state:
-                    st.session_state["reported"] = []
-
-                already_reported = any(
-                    r["User"] == row["User"] and r["Review Text"] == row["Review Text"]
-                    for r in st.session_state["reported"]
-                )
-
-                # tombol report otomatis
-                if already_reported:
-                    st.button("✅ Already Reported", key=f"reported_{idx}", disabled=True)
-                else:
-                    if st.button("🚨 Automatic Report", key=f"report_{idx}"):
-                        try:
-                            auto_report_review(row, report_choice)
-
-                            # tambahkan ke daftar reported
-                            st.session_state["reported"].append({
-                                "User": row["User"],
-                                "Review Text": row["Review Text"],
-                                "Date": row["Date (Parsed)"],
-                                "Kategori Report": report_choice
-                            })
-
-                            st.success(f"✅ Review from **{row['User']}** successfully reported and added to the list below!")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Failed Report: {e}")
-
         if "reported" in st.session_state and st.session_state["reported"]:
             st.divider()
             st.markdown("### 🧾 Reviews that have been submitted")
             st.dataframe(pd.DataFrame(st.session_state["reported"]), use_container_width=True, hide_index=True)
 
+        # --- export hanya dibuat saat tombol ditekan ---
         place_filename = st.session_state.place_name.replace(" ", "_").replace("/", "_")
-        buffer = io.BytesIO()
-        df.to_excel(buffer, index=False, engine="openpyxl")
-        buffer.seek(0)
-        st.download_button(
-            "💾 Download Excel File",
-            buffer,
-            file_name=f"low_rating_reviews_{place_filename}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ec1, ec2 = st.columns([2, 1])
+        export_fmt = ec1.selectbox("Export format", EXPORT_FORMATS, key="export_fmt")
+        fingerprint = dataframe_fingerprint(df)
+        if ec2.button("📦 Prepare export", key="prepare_export"):
+            with st.spinner("Building export..."):
+                try:
+                    st.session_state.export = (fingerprint, export_fmt) + build_export(fingerprint, export_fmt, df)
+                except ImportError as e:
+                    st.error(f"Format ini membutuhkan dependency tambahan (pyarrow untuk Parquet): {e}")
+
+        export = st.session_state.get("export")
+        if export and export[:2] == (fingerprint, export_fmt):
+            _, _, data, ext, mime = export
+            st.download_button(
+                f"💾 Download {export_fmt} File",
+                data,
+                file_name=f"low_rating_reviews_{place_filename}.{ext}",
+                mime=mime,
+            )
+
+
+@st.fragment(run_every=1.0)
+def render_scrape_progress():
+    """
+    polling status job scraping di background; hanya fragment ini yang dirender ulang tiap detik
+    """
+    job_id = st.session_state.get("scrape_job_id")
+    manager = get_job_manager()
+    if not job_id:
+        return
+    info = manager.status(job_id)
+    if info is None:
+        # job sudah kadaluarsa: lepaskan supaya tombol scraping aktif lagi
+        st.session_state.scrape_job_id = None
+        st.rerun()
+
+    if info["status"] in ("queued", "running"):
+        st.info(
+            f"⏳ {info['phase']} — {info['harvested']} reviews harvested, {info['new']} new low-rating "
+            f"({info['elapsed']:.0f}s)"
         )
+        if info["percent"] is not None:
+            eta = f", ETA {info['eta']:.0f}s" if info["eta"] is not None else ""
+            st.progress(
+                info["percent"] / 100,
+                text=f"{info['matched']} / {info['expected']} selected-rating reviews ({info['percent']:.0f}%{eta})",
+            )
+        for warning in info["warnings"]:
+            st.warning(warning)
+        if st.button("⛔ Cancel scraping", key=f"cancel_{job_id}"):
+            manager.cancel(job_id)
+        return
+
+    result = manager.result(job_id)
+    st.session_state.scrape_job_id = None
+    messages = [("warning", w) for w in info["warnings"]]
+    if info["status"] == "failed":
+        messages.append(("error", f"gagal scraping {info['error']}"))
+    elif result is not None and not result[0].empty:
+        df, place_name, new_count = result
+        st.session_state.df_reviews = df
+        st.session_state.place_name = place_name
+        st.session_state.loaded_place_key = place_key_for(info["link"])
+        prefix = "⛔ Cancelled — " if info["status"] == "cancelled" else "✅ "
+        messages.append(
+            ("success", f"{prefix}{new_count} new — {len(df)} stored low-rating reviews from **{place_name}**")
+        )
+    else:
+        messages.append(("warning", "No reviews with the selected ratings found."))
+    st.session_state.scrape_messages = messages
+    # hasil baru perlu dirender oleh daftar review dan panel lain
+    st.rerun()
+
+
+@st.fragment(run_every=1.0)
+def render_batch_progress():
+    """
+    polling job batch scraping; sama seperti render_scrape_progress tapi progress per tempat
+    """
+    job_id = st.session_state.get("batch_job_id")
+    manager = get_job_manager()
+    if not job_id:
+        return
+    info = manager.status(job_id)
+    if info is None:
+        st.session_state.batch_job_id = None
+        st.rerun()
+
+    if info["status"] in ("queued", "running"):
+        total = info["places_total"] or 1
+        st.progress(info["places_done"] / total, text=f"{info['phase']} ({info['elapsed']:.0f}s)")
+        if st.button("⛔ Cancel batch", key=f"cancel_{job_id}"):
+            manager.cancel(job_id)
+        return
+
+    result = manager.result(job_id)
+    st.session_state.batch_job_id = None
+    messages = [("warning", w) for w in info["warnings"]]
+    if info["status"] == "failed":
+        messages.append(("error", f"gagal batch scraping {info['error']}"))
+    else:
+        df_batch, df_timings = result
+        st.session_state.batch_timings = df_timings
+        if not df_batch.empty:
+            st.session_state.df_reviews = df_batch
+            st.session_state.place_name = f"{df_batch['Place Key'].nunique()} places"
+            prefix = "⛔ Cancelled — " if info["status"] == "cancelled" else "✅ "
+            messages.append(
+                ("success", f"{prefix}Collected {len(df_batch)} low-rating reviews from {info['places_total']} places")
+            )
+        else:
+            messages.append(("warning", "No 1★ or 2★ reviews found."))
+    st.session_state.batch_messages = messages
+    st.rerun()
 
 
-with col2:
+@st.fragment
+def render_distribution_panel(gmaps_link):
+    """
+    peta, distribusi rating dan ringkasan review negatif sebagai fragment terpisah
+    """
+    place_name = st.session_state.get("place_name") or "Lokasi Tidak Diketahui"
     if gmaps_link:
         st.markdown("### 🗺️ Google Maps View")
         try:
@@ -899,47 +3006,14 @@ with col2:
             st.markdown(f"📍 **{place_name}**")
             st.components.v1.iframe(embed_url, height=500)
 
-            # --- siapkan selenium ---
-            options = webdriver.ChromeOptions()
-            options.add_argument("--headless=new")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-
-            driver = None
+            # --- distribusi dari cache, browser hanya jika belum ada ---
+            busy = False
             try:
-                driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-                driver.get(gmaps_link)
-                time.sleep(6)
-
-                # handle redirect (maps.app.goo.gl)
-                current_url = driver.current_url
-                if "maps.app.goo.gl" in current_url:
-                    time.sleep(3)
-                    current_url = driver.current_url
-                    driver.get(current_url)
-                    time.sleep(5)
-
-                # ambil distribusi bintang dari tabel <tr class="BHOKXe">
-                rows = driver.find_elements(By.CSS_SELECTOR, "tr.BHOKXe")
-                distribusi = {}
-                for r in rows:
-                    label = r.get_attribute("aria-label")  # contoh: "5 stars, 182 reviews"
-                    if label:
-                        try:
-                            bintang = int(label.split()[0])
-                            jumlah = int(label.split(",")[1].split()[0])
-                            distribusi[bintang] = jumlah
-                        except Exception:
-                            continue
-
-            finally:
-                # pastikan driver ditutup jika dibuat
-                if driver is not None:
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
+                distribusi = get_rating_distribution(gmaps_link)
+            except DriverPoolBusy:
+                busy = True
+                distribusi = None
+                st.info("⏳ Rating distribution not available right now — all browsers are busy scraping.")
 
             # --- tampilkan distribusi ---
             if distribusi:
@@ -987,7 +3061,7 @@ with col2:
                     )
                 else:
                     st.markdown("**⭐ Average Rating: {place_name} **")
-            else:
+            elif not busy:
                 st.info("Tidak ada data penyebaran rating yang ditemukan.")
 
         except Exception as e:
@@ -995,9 +3069,6 @@ with col2:
 
     # --- bagian review tetap ---
     if "df_reviews" in st.session_state and not st.session_state.df_reviews.empty:
-        import altair as alt
-        import pandas as pd
-
         st.markdown("### 💢 Negative Review Distribution (1–2 Stars) - {place_name}")
         df = st.session_state.df_reviews
 
@@ -1036,3 +3107,154 @@ with col2:
 
     else:
         st.info("Belum ada data review untuk diringkas.")
+
+
+# ---------- streamlit ui ----------
+# streamlit menjalankan script ini sebagai __main__; import dari tests/ dan benchmarks.py tidak merender ui
+if __name__ == "__main__":
+    # st.set_page_config(page_title="Google Maps Review Scraper", layout="wide")
+    st.title("📍 Google Maps Review Scraper")
+
+    with st.sidebar.expander("📈 Scrape metrics"):
+        metrics = get_scrape_metrics()
+        if metrics.last_run:
+            last = metrics.last_run
+            st.caption(
+                f"Last run: {last['reviews']} reviews in {last['seconds']:.1f}s "
+                f"({last['reviews_per_second']:.1f}/s), {last['webdriver_commands']} WebDriver commands"
+            )
+            st.dataframe(
+                pd.DataFrame(sorted(last["phases"].items(), key=lambda kv: -kv[1]), columns=["Phase", "Seconds"]).round(3),
+                hide_index=True,
+            )
+        st.caption(
+            f"JSON log: `{metrics.log_path}` · Prometheus: `{metrics.prom_path}` · "
+            f"block profile: `{RESOURCE_BLOCK_PROFILE}` (set `GMAPS_BLOCK_PROFILE`)"
+        )
+        st.code(metrics.prometheus_text(), language="text")
+
+    with st.sidebar.expander("⏱️ Startup report"):
+        report = startup_report()
+        st.dataframe(
+            pd.DataFrame({"Component": list(report), "Seconds": [round(v, 3) for v in report.values()]}),
+            use_container_width=True, hide_index=True
+        )
+        if "load semantic model" not in report:
+            st.caption("Semantic model not loaded yet — it loads on the first classification.")
+        else:
+            stats = get_embedding_cache().stats()
+            st.markdown("**🧠 Embedding cache**")
+            st.caption(
+                f"hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits / {stats['misses']} misses) · "
+                f"{stats['entries']}/{stats['capacity']} entries · {stats['bytes_used'] / 1e6:.1f} MB"
+            )
+
+    if "google_logged" not in st.session_state:
+        st.session_state.google_logged = is_cookie_file_present()
+
+    st.markdown("## Login Google Account")
+    if not st.session_state.google_logged:
+        st.markdown(
+            "Press the button below to open the Chrome browser, then log in to your Google account in the window that appears. After successfully logging in, cookies will be saved."
+        )
+        if st.button("🔑 Open Browser for login"):
+            ok = start_manual_google_login(timeout=300)
+            if ok:
+                st.success("login successful cookies saved")
+                st.session_state.google_logged = True
+                # sesi pool lama belum memakai cookies baru
+                get_driver_pool().reset()
+            else:
+                st.error("login failed or timeout, please try again")
+
+    else:
+        st.success("You are already logged in using stored cookies.n")
+
+    if st.session_state.google_logged and POOL_WARM_UP:
+        start_pool_warm_up()
+
+    st.divider()
+
+    # jika belum login tampilkan instruksi dan hentikan
+    if not st.session_state.google_logged:
+        st.info("Please log in before using the scraping feature.")
+        st.stop()
+
+    # setelah login tampilkan fitur scraping yang sama dengan skripmu
+    gmaps_link = st.text_input("🔗 Google Maps Link:")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        if "df_reviews" not in st.session_state:
+            st.session_state.df_reviews = pd.DataFrame()
+            st.session_state.place_name = ""
+
+        # tampilkan review tersimpan untuk link ini tanpa harus scraping ulang
+        if gmaps_link and st.session_state.get("loaded_place_key") != place_key_for(gmaps_link):
+            df_stored = get_review_store().load_place(place_key_for(gmaps_link))
+            st.session_state.loaded_place_key = place_key_for(gmaps_link)
+            if not df_stored.empty:
+                st.session_state.df_reviews = df_stored
+                st.session_state.place_name = df_stored["Place"].iloc[-1]
+
+        unfinished = get_review_store().unfinished_jobs(place_key_for(gmaps_link)) if gmaps_link else []
+        if unfinished:
+            job = unfinished[0]
+            st.info(
+                f"⏯️ Previous scrape `{job['job_id']}` stopped ({job['status']}) after {job['harvested']} reviews — "
+                "Start Scraping resumes it and skips reviews already captured."
+            )
+        scrape_ratings = st.multiselect(
+            "⭐ Ratings to collect", [1.0, 2.0, 3.0, 4.0, 5.0], default=list(DEFAULT_RATINGS),
+            help="With 'Lowest rating' sort, scrolling stops at the first review above the highest selected rating.",
+        ) or list(DEFAULT_RATINGS)
+        incremental = st.checkbox(
+            "⚡ Incremental (only fetch reviews newer than the stored ones)",
+            value=bool(gmaps_link)
+            and get_review_store().covered_since(place_key_for(gmaps_link), scrape_ratings) is not None,
+            help="Falls back to a full scrape when these ratings were never fully scraped for this place.",
+        )
+
+        if st.button("🚀 Start Scraping", disabled=bool(st.session_state.get("scrape_job_id"))):
+            if gmaps_link:
+                st.session_state.scrape_job_id = get_job_manager().submit(
+                    gmaps_link, incremental=incremental, ratings=tuple(scrape_ratings)
+                )
+            else:
+                st.error("Please input a valid Google Maps link.")
+
+        render_scrape_progress()
+        for kind, text in st.session_state.pop("scrape_messages", []):
+            getattr(st, kind)(text)
+
+        with st.expander("📚 Batch scraping (multiple places)"):
+            batch_text = st.text_area("Google Maps links (one per line):", key="batch_links")
+            batch_file = st.file_uploader("...or upload a .txt/.csv file", type=["txt", "csv"], key="batch_file")
+            bc1, bc2 = st.columns(2)
+            max_browsers = bc1.number_input("Max parallel browsers", 1, 16, BATCH_MAX_BROWSERS)
+            place_timeout = bc2.number_input("Timeout per place (s)", 30, 7200, BATCH_PLACE_TIMEOUT, step=30)
+            batch_incremental = st.checkbox("⚡ Incremental", value=True, key="batch_incremental")
+
+            if st.button("🚀 Start Batch Scraping", disabled=bool(st.session_state.get("batch_job_id"))):
+                links = read_place_links(batch_text, batch_file)
+                if links:
+                    st.session_state.batch_job_id = get_job_manager().submit_batch(
+                        links, max_browsers=int(max_browsers), place_timeout=int(place_timeout),
+                        incremental=batch_incremental,
+                    )
+                else:
+                    st.error("Please input at least one valid Google Maps link.")
+
+            render_batch_progress()
+            for kind, text in st.session_state.pop("batch_messages", []):
+                getattr(st, kind)(text)
+
+            if "batch_timings" in st.session_state:
+                st.dataframe(st.session_state.batch_timings, use_container_width=True, hide_index=True)
+
+        render_review_list()
+
+
+    with col2:
+        render_distribution_panel(gmaps_link)
@@ -0,0 +1,306 @@
+"""
+benchmark developer untuk app.py, dijalankan di luar ui streamlit
+
+    python benchmarks.py cleaning --sizes 10000 100000
+    python benchmarks.py review-list --rows 1000
+    python benchmarks.py rerun --rows 1000 --repeat 10
+    python benchmarks.py semantic --repeat 5
+    python benchmarks.py block-profiles "https://maps.app.goo.gl/..."
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from selenium.common.exceptions import WebDriverException
+
+import app
+
+CLEANING_BASE_TEXTS = [
+    "The food was GREAT!!! 😍😍 but the service was slow...",
+    "Check https://example.com/menu?x=1 and www.spam.biz for deals",
+    "Worst place ever 👎🏽 never again. The staff didn't care!",
+    "Café au lait was cold — überteuert & dirty tables",
+    "I'm not coming back, it's a 1/10 experience #fail @owner",
+    "Tempatnya kotor, pelayanannya lambat sekali 😡",
+    "ALL CAPS REVIEW WITH NUMBERS 123 AND $$$ SIGNS",
+]
+
+
+def benchmark_text_cleaning(sizes=(10_000, 100_000, 1_000_000), with_reference=True):
+    """
+    ukur waktu cleaner per-review vs batch pada n review sintetis (teks unik)
+    """
+    results = []
+    for n in sizes:
+        texts = pd.Series([f"{CLEANING_BASE_TEXTS[i % len(CLEANING_BASE_TEXTS)]} review number {i}" for i in range(n)])
+        row = {"Rows": n}
+        if with_reference:
+            start = time.perf_counter()
+            texts.map(app.clean_review_text_en)
+            row["Per-review (s)"] = round(time.perf_counter() - start, 3)
+        start = time.perf_counter()
+        app.clean_review_texts(texts)
+        row["Batch (s)"] = round(time.perf_counter() - start, 3)
+        if with_reference:
+            row["Speedup"] = round(row["Per-review (s)"] / max(row["Batch (s)"], 1e-9), 2)
+        results.append(row)
+    return pd.DataFrame(results)
+
+
+def make_fixture_reviews(n=1000, seed=0):
+    """
+    dataframe review sintetis untuk mengukur biaya rerun tanpa browser
+    """
+    rng = np.random.default_rng(seed)
+    words = ["food", "cold", "rude", "staff", "dirty", "slow", "service", "price", "parking", "waited", "never", "again"]
+    return pd.DataFrame({
+        "Place": "Fixture Place",
+        "User": [f"user_{i}" for i in range(n)],
+        "Total Reviews": [f"{rng.integers(1, 200)} reviews" for _ in range(n)],
+        "Rating": rng.choice([1.0, 2.0], size=n),
+        "Date (Raw)": "2 weeks ago",
+        "Date (Parsed)": pd.Timestamp.now().normalize() - pd.Timedelta(weeks=2),
+        "Review Text": [" ".join(rng.choice(words, size=rng.integers(5, 40))) for _ in range(n)],
+    })
+
+
+def benchmark_review_list(n=1000, formats=("CSV (gzip)",)):
+    """
+    ukur langkah data yang dijalankan fragment render_review_list pada n review sintetis:
+    kategorisasi (cold lalu cache hit), filter dan export
+    """
+    df = make_fixture_reviews(n)
+    fingerprint = app.dataframe_fingerprint(df)
+    results = []
+
+    def timed(step, fn):
+        start = time.perf_counter()
+        out = fn()
+        results.append({"Step": step, "ms": round((time.perf_counter() - start) * 1000, 1)})
+        return out
+
+    categorized = timed("categorize (cold)", lambda: app.categorize_reviews(fingerprint, df))
+    timed("categorize (cached)", lambda: app.categorize_reviews(fingerprint, df))
+    timed("filter", lambda: app.filter_reviews(categorized, ratings=[1.0], query="cold"))
+    for fmt in formats:
+        timed(f"export {fmt}", lambda: app.build_export(fingerprint, fmt, categorized))
+    return pd.DataFrame(results)
+
+
+def _review_list_only():
+    # script AppTest yang hanya berisi fragment tabel review: biaya rerun setelah fragment
+    import app
+
+    app.render_review_list()
+
+
+def benchmark_rerun(n=1000, repeat=10, timeout=300):
+    """
+    ukur rerun saat pindah halaman tabel review dengan fixture n review (AppTest, tanpa browser)
+    sebelum fragment setiap klik menjalankan ulang seluruh app.py; sesudahnya hanya render_review_list
+    run pertama (load model, kategorisasi) tidak dihitung
+    """
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["GMAPS_POOL_WARM_UP"] = "0"
+    df = make_fixture_reviews(n)
+    apps = {
+        "full script rerun (before)": AppTest.from_file(
+            os.path.join(os.path.dirname(os.path.abspath(app.__file__)), "app.py"), default_timeout=timeout
+        ),
+        "review-list fragment rerun (after)": AppTest.from_function(_review_list_only, default_timeout=timeout),
+    }
+    results = []
+    for label, at in apps.items():
+        at.session_state["google_logged"] = True
+        at.session_state["df_reviews"] = df
+        at.session_state["place_name"] = "Fixture Place"
+        at.run()
+        timings = []
+        for page in range(2, repeat + 2):
+            start = time.perf_counter()
+            at.number_input(key="current_page").set_value(page).run()
+            timings.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{label}: {at.exception[0].message}")
+        results.append({
+            "Rerun": label,
+            "Median (ms)": round(float(np.median(timings)), 1),
+            "Max (ms)": round(max(timings), 1),
+        })
+    return pd.DataFrame(results)
+
+
+SEMANTIC_FIXTURE_TEXTS = [
+    "this place is a scam, they paid people to write fake reviews",
+    "visit my website for cheap followers www example com",
+    "the owner is my cousin so obviously five stars from the family",
+    "the waiter was a complete idiot and the food was crap",
+    "the staff kept mocking me and laughed at my accent",
+    "they refused to serve us because of our religion",
+    "the manager's phone number is 0812 3456 789, call him at home",
+    "i have never been here but the parking lot looks nice",
+    "ok",
+    "the football match yesterday was amazing, what a goal",
+    "cold food, slow service, dirty tables and rude cashier",
+    "terrible experience, waited two hours and nobody apologised",
+]
+
+
+def _current_rss_mb():
+    # rss saat ini butuh psutil; peak rss dari resource tidak bisa dikurangkan jadi kenaikan per backend
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 1e6
+
+
+def ensure_onnx_model():
+    """
+    export model onnx int8 di proses terpisah kalau belum ada,
+    supaya import torch saat export tidak ikut terukur di rss backend onnx
+    """
+    if not os.path.exists(os.path.join(app.ONNX_MODEL_DIR, "model-int8.onnx")):
+        subprocess.run([sys.executable, "-c", "import app; app.export_onnx_model()"],
+                       check=True, cwd=os.path.dirname(os.path.abspath(app.__file__)))
+
+
+def compare_semantic_backends(texts=None, repeat=5):
+    """
+    bandingkan backend torch dan onnx int8: kecocokan top-1 kategori pada fixture,
+    throughput reviews/detik dan kenaikan resident memory setelah model dimuat (N/A tanpa psutil)
+    onnx diukur lebih dulu agar rss-nya tidak tertutup torch
+    """
+    texts = list(texts or SEMANTIC_FIXTURE_TEXTS)
+    ensure_onnx_model()
+    results = {}
+    for backend in ("onnx", "torch"):
+        rss_before = _current_rss_mb()
+        model, category_embeddings = app.build_semantic_model(backend)
+        embeddings = app.normalize_rows(model.encode(texts, convert_to_numpy=True))
+        rss_after = _current_rss_mb()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            model.encode(texts, batch_size=app.CLASSIFY_BATCH_SIZE, convert_to_numpy=True)
+        elapsed = time.perf_counter() - start
+        results[backend] = {
+            "labels": (embeddings @ category_embeddings.T).argmax(axis=1),
+            "reviews_per_sec": round(len(texts) * repeat / elapsed, 1),
+            "rss_mb": "N/A" if rss_before is None else round(rss_after - rss_before, 1),
+        }
+
+    agreement = float((results["onnx"]["labels"] == results["torch"]["labels"]).mean())
+    return pd.DataFrame([
+        {
+            "Backend": backend,
+            "Reviews/sec": r["reviews_per_sec"],
+            "RSS increase (MB)": r["rss_mb"],
+            "Top-1 agreement": agreement,
+        }
+        for backend, r in results.items()
+    ])
+
+
+def drain_performance_log(driver):
+    try:
+        return driver.get_log("performance")
+    except WebDriverException:
+        return []
+
+
+def network_bytes_from_log(entries):
+    # total byte terkirim lewat jaringan (encodedDataLength) dari performance log
+    total = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") == "Network.loadingFinished":
+            total += message.get("params", {}).get("encodedDataLength", 0)
+    return total
+
+
+def benchmark_block_profiles(gmaps_link, profiles=("off", "lean"), max_scrolls=30):
+    """
+    bandingkan byte jaringan dan waktu per 100 review dengan dan tanpa profil blokir
+    tiap profil memakai pool 1 sesi tersendiri supaya cache dan cookies tidak tercampur
+    """
+    results = []
+    for profile in profiles:
+        pool = app.DriverPool(size=1, capture_network=True, block_profile=profile)
+        try:
+            pool.warm_up()
+            with pool.session() as driver:
+                # trafik warm-up sesi (startup, cookies) tidak ikut dihitung
+                drain_performance_log(driver)
+            harvested = [0]
+            start = time.perf_counter()
+            for _ in app.stream_low_rating_reviews(
+                gmaps_link, max_scrolls=max_scrolls, pool=pool,
+                on_blocks=lambda keys, _ratings: harvested.__setitem__(0, harvested[0] + len(keys)),
+            ):
+                pass
+            elapsed = time.perf_counter() - start
+            with pool.session() as driver:
+                total_bytes = network_bytes_from_log(drain_performance_log(driver))
+        finally:
+            pool.close()
+        per_100 = 100 / max(harvested[0], 1)
+        results.append({
+            "profile": profile,
+            "reviews": harvested[0],
+            "MB": round(total_bytes / 1e6, 2),
+            "seconds": round(elapsed, 1),
+            "MB / 100 reviews": round(total_bytes / 1e6 * per_100, 2),
+            "s / 100 reviews": round(elapsed * per_100, 2),
+        })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cleaning = commands.add_parser("cleaning", help="cleaner per-review vs batch")
+    cleaning.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    cleaning.add_argument("--no-reference", action="store_true", help="lewati cleaner per-review (lambat)")
+
+    review_list = commands.add_parser("review-list", help="langkah data fragment tabel review")
+    review_list.add_argument("--rows", type=int, default=1000)
+    review_list.add_argument("--formats", nargs="+", default=["CSV (gzip)"], choices=app.EXPORT_FORMATS)
+
+    rerun = commands.add_parser("rerun", help="rerun seluruh script vs fragment tabel review (AppTest)")
+    rerun.add_argument("--rows", type=int, default=1000)
+    rerun.add_argument("--repeat", type=int, default=10)
+
+    semantic = commands.add_parser("semantic", help="backend torch vs onnx int8 (butuh onnxruntime, onnx, psutil)")
+    semantic.add_argument("--repeat", type=int, default=5)
+
+    blocking = commands.add_parser("block-profiles", help="byte jaringan dan waktu per 100 review per profil blokir")
+    blocking.add_argument("gmaps_link")
+    blocking.add_argument("--profiles", nargs="+", default=["off", "lean"], choices=list(app.RESOURCE_BLOCK_PROFILES))
+    blocking.add_argument("--max-scrolls", type=int, default=30)
+
+    args = parser.parse_args()
+    if args.command == "cleaning":
+        result = benchmark_text_cleaning(tuple(args.sizes), with_reference=not args.no_reference)
+    elif args.command == "review-list":
+        result = benchmark_review_list(args.rows, tuple(args.formats))
+    elif args.command == "rerun":
+        result = benchmark_rerun(args.rows, args.repeat)
+    elif args.command == "semantic":
+        result = compare_semantic_backends(repeat=args.repeat)
+    elif args.command == "block-profiles":
+        result = benchmark_block_profiles(args.gmaps_link, tuple(args.profiles), args.max_scrolls)
+    print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+# app.py ada di root repo, bukan package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    # import app.py butuh streamlit, selenium, nltk, dll; dilewati kalau belum terpasang
+    return pytest.importorskip("app")
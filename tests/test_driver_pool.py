@@ -0,0 +1,10 @@
+def test_every_caller_shares_one_pool(app):
+    # warm-up, panel distribusi, scraping dan login memakai accessor yang sama
+    assert app.get_driver_pool() is app.get_driver_pool()
+
+
+def test_reset_retires_sessions_of_the_shared_pool(app):
+    pool = app.get_driver_pool()
+    generation = pool._generation
+    pool.reset()
+    assert app.get_driver_pool()._generation == generation + 1
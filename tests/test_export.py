@@ -0,0 +1,41 @@
+import io
+import zipfile
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+
+def two_branches():
+    # dua cabang jaringan toko dengan nama tampilan yang sama
+    return pd.DataFrame({
+        "Place": ["Starbucks", "Starbucks", "Starbucks"],
+        "Place Key": ["https://maps.app.goo.gl/a", "https://maps.app.goo.gl/b", "https://maps.app.goo.gl/a"],
+        "Rating": [1.0, 2.0, 1.0],
+        "Review Text": ["cold", "slow", "rude"],
+    })
+
+
+def test_split_places_groups_by_place_key(app):
+    parts = app._split_places(two_branches())
+    assert [len(part) for _, _, part in parts] == [2, 1]
+    assert len({app._place_label(place, suffix) for place, suffix, _ in parts}) == 2
+
+
+def test_csv_export_has_one_file_per_branch(app):
+    df = two_branches()
+    data, ext, _ = app.build_export(app.dataframe_fingerprint(df), "CSV (gzip)", df)
+    assert ext == "zip"
+    assert len(zipfile.ZipFile(io.BytesIO(data)).namelist()) == 2
+
+
+def test_xlsx_export_has_one_sheet_per_branch(app):
+    openpyxl = pytest.importorskip("openpyxl")
+    df = two_branches()
+    data, ext, _ = app.build_export(app.dataframe_fingerprint(df), "Excel (.xlsx)", df)
+    sheets = openpyxl.load_workbook(io.BytesIO(data), read_only=True).sheetnames
+    assert ext == "xlsx" and len(sheets) == 2 and all(name.startswith("Starbucks_") for name in sheets)
+
+
+def test_sheet_title_keeps_key_suffix(app):
+    assert app._place_label("A" * 40, "abc123", 31) == "A" * 24 + "_abc123"
@@ -0,0 +1,26 @@
+import threading
+
+
+def test_single_place_job_runs_while_a_batch_is_running(app, monkeypatch):
+    release_batch = threading.Event()
+    single_done = threading.Event()
+
+    def fake_batch(links, stop_event=None, **kwargs):
+        release_batch.wait(10)
+        return None
+
+    def fake_scrape(gmaps_link, **kwargs):
+        single_done.set()
+        return None, "Place", 0
+
+    monkeypatch.setattr(app, "scrape_places", fake_batch)
+    monkeypatch.setattr(app, "scrape_into_store", fake_scrape)
+    manager = app.ScrapeJobManager(max_workers=1, batch_workers=1)
+    try:
+        manager.submit_batch(["https://maps.app.goo.gl/a"], store=object())
+        job_id = manager.submit("https://maps.app.goo.gl/b", pool=object(), store=object())
+        # job satu tempat tidak menunggu batch selesai
+        assert single_done.wait(5)
+    finally:
+        release_batch.set()
+    assert manager.status(job_id) is not None
@@ -0,0 +1,47 @@
+import pytest
+
+# halaman hasil sort "Lowest rating" sintetis: (halaman label rating, ratings, review tersimpan, halaman terpakai)
+RATING_CUTOFF_FIXTURES = [
+    ([["1 star"] * 3, ["1 star", "2 stars", "2 stars"], ["2 stars", "3 stars", "4 stars"], ["5 stars"] * 3],
+     (1.0, 2.0), 7, 3),
+    ([["1 bintang", "1 bintang"], ["2 bintang", "3 bintang"], ["5 bintang"]], (1.0,), 2, 2),
+    ([["1 star", "2 stars"], ["3 stars", "3 stars"], ["3 stars", "4 stars"], ["5 stars"]], (1.0, 2.0, 3.0), 5, 3),
+    ([["1 star"], ["2 stars"]], (1.0, 2.0), 2, 2),
+    ([["1 star", "", "2 stars"], ["4 stars"], ["5 stars"]], (1.0, 2.0), 2, 2),
+]
+
+
+def harvest_sorted_pages(app, pages, ratings):
+    """
+    jalankan logika potong batch stream_low_rating_reviews pada halaman fixture tanpa browser
+    return (jumlah review tersimpan, jumlah halaman yang dipanen)
+    """
+    kept, consumed = 0, 0
+    for p, labels in enumerate(pages):
+        blocks = [{"id": f"{p}-{i}", "rating": label, "text": "fixture", "user": "u", "date": ""}
+                  for i, label in enumerate(labels)]
+        keys = [app.review_key("fixture", item) for item in blocks]
+        blocks, keys, stop = app.truncate_batch(blocks, keys, ratings=ratings)
+        kept += len(app.build_review_rows(blocks, "Fixture", "fixture", ratings=ratings))
+        consumed += 1
+        if stop:
+            break
+    return kept, consumed
+
+
+@pytest.mark.parametrize("pages, ratings, want_kept, want_pages", RATING_CUTOFF_FIXTURES)
+def test_lowest_sort_stops_at_rating_ceiling(app, pages, ratings, want_kept, want_pages):
+    assert harvest_sorted_pages(app, pages, ratings) == (want_kept, want_pages)
+
+
+def test_known_review_stops_before_ceiling(app):
+    blocks = [{"id": str(i), "rating": label} for i, label in enumerate(["1 star", "1 star", "2 stars", "4 stars"])]
+    keys = [b["id"] for b in blocks]
+    kept, kept_keys, stop = app.truncate_batch(blocks, keys, known=lambda item: item["id"] == "1", ratings=(1.0, 2.0))
+    assert stop and kept_keys == ["0"]
+
+
+def test_job_id_depends_on_rating_set(app):
+    link = "https://maps.app.goo.gl/example"
+    assert app.scrape_job_id(link, ratings=(1.0, 2.0)) == app.scrape_job_id(link, ratings=(2.0, 1.0))
+    assert app.scrape_job_id(link, ratings=(1.0, 2.0)) != app.scrape_job_id(link, ratings=(1.0, 2.0, 3.0))
@@ -0,0 +1,33 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+NOW = pd.Timestamp("2024-06-15 18:30")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2 weeks ago", "2024-06-01"),
+    ("a month ago", "2024-05-16"),
+    ("3 hari lalu", "2024-06-12"),
+    ("setahun yang lalu", "2023-06-16"),
+    ("an hour ago", "2024-06-15"),
+    ("Edited 2 weeks ago", "2024-06-01"),
+    ("yesterday", "2024-06-14"),
+    ("Baru saja", "2024-06-15"),
+    ("March 2020", "2020-03-01"),
+    ("Maret 2020", "2020-03-01"),
+])
+def test_relative_dates_are_pinned_and_normalized(app, text, expected):
+    assert app.RelativeDateParser(NOW).parse(text) == pd.Timestamp(expected)
+
+
+@pytest.mark.parametrize("text", ["", "Edited", "Thursday", "menit", "weeks ago", "Monday evening"])
+def test_unparseable_dates_become_nat(app, text):
+    # unit di dalam kata lain atau tanpa jumlah bukan tanggal relatif
+    assert pd.isna(app.RelativeDateParser(NOW).parse(text))
+
+
+def test_parse_series_maps_unique_values(app):
+    parsed = app.RelativeDateParser(NOW).parse_series(["2 weeks ago", None, "2 weeks ago"])
+    assert parsed.iloc[0] == parsed.iloc[2] == pd.Timestamp("2024-06-01")
+    assert pd.isna(parsed.iloc[1])
@@ -0,0 +1,29 @@
+import pytest
+
+CLEANING_GOLDEN_SAMPLES = [
+    "",
+    "The food was GREAT!!! 😍😍 but the service was slow...",
+    "Check https://example.com/menu?x=1 and www.spam.biz for deals",
+    "Worst place ever 👎🏽 never again. The staff didn't care!",
+    "Café au lait was cold — überteuert & dirty tables",
+    "I'm not coming back, it's a 1/10 experience #fail @owner",
+    "👨‍👩‍👧‍👦 family dinner ruined, kids got sick",
+    "Tempatnya kotor, pelayanannya lambat sekali 😡",
+    "http://a.co😀text after emoji glued to url",
+    "Multiple   spaces\tand\nnew lines   here",
+    "ALL CAPS REVIEW WITH NUMBERS 123 AND $$$ SIGNS",
+    "Emoji between words: good🍕pizza, bad☕coffee",
+    "日本語のレビュー とても悪い",
+    "Non-breaking\u00a0space and zero\u200bwidth",
+]
+
+
+@pytest.mark.parametrize("text", CLEANING_GOLDEN_SAMPLES)
+def test_batch_cleaner_matches_reference(app, text):
+    assert app.clean_review_texts([text]).tolist() == [app.clean_review_text_en(text)]
+
+
+def test_batch_cleaner_keeps_order_and_missing_values(app):
+    texts = CLEANING_GOLDEN_SAMPLES + [None, CLEANING_GOLDEN_SAMPLES[1]]
+    expected = [app.clean_review_text_en(t) for t in texts]
+    assert app.clean_review_texts(texts).tolist() == expected